@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.graphs import grid_graph_data
+from src.controllers.fleet_manager import TICK_SECONDS
+
+
+class Client:
+    """One connection that keeps `window` assign requests in flight until the deadline."""
+
+    def __init__(self, address, window: int, robots: list, stations: list, seed: int):
+        self.address = address
+        self.window = window
+        self.robots = robots
+        self.stations = stations
+        self.rng = random.Random(seed)
+        self.sent = {}
+        self.latencies = []
+        self.errors = 0
+
+    async def run(self, deadline: float):
+        reader, writer = await asyncio.open_connection(*self.address, limit=1 << 24)
+        slots = asyncio.Semaphore(self.window)
+        receiver = asyncio.create_task(self.receive(reader, slots))
+        request_id = 0
+        while time.perf_counter() < deadline:
+            await slots.acquire()
+            request_id += 1
+            self.sent[request_id] = time.perf_counter()
+            writer.write(json.dumps({"id": request_id, "op": "assign", "robot": self.rng.choice(self.robots),
+                                     "vertex": self.rng.choice(self.stations)}).encode() + b"\n")
+            if request_id % 32 == 0:
+                await writer.drain()
+        await writer.drain()
+        for _ in range(self.window):
+            await slots.acquire()
+        receiver.cancel()
+        writer.close()
+
+    async def receive(self, reader: asyncio.StreamReader, slots: asyncio.Semaphore):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            response = json.loads(line)
+            self.latencies.append(time.perf_counter() - self.sent.pop(response["id"]))
+            if not response["ok"]:
+                self.errors += 1
+            slots.release()
+
+
+async def subscribe(address, slow: bool, deadline: float) -> dict:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if slow:
+        # A small receive window, so the server sees the backlog within seconds rather than megabytes
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(address)
+    # asyncio keeps reading into the client's buffer until 2 x limit, so a slow client's must stay small
+    reader, writer = await asyncio.open_connection(sock=sock, limit=1 << 16 if slow else 1 << 24)
+    writer.write(b'{"id": 0, "op": "subscribe"}\n')
+    await writer.drain()
+    frames = full = size = 0
+    if slow:
+        # Never read: the server has to shed this subscriber's frames, not stall on them
+        await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+    while time.perf_counter() < deadline:
+        try:
+            line = await asyncio.wait_for(reader.readline(), deadline - time.perf_counter())
+        except asyncio.TimeoutError:
+            break
+        frame = json.loads(line)
+        if frame.get("type") == "state":
+            frames += 1
+            full += frame["full"]
+            size += len(line)
+    writer.close()
+    return {"frames": frames, "full": full, "bytes": size}
+
+
+async def request(address, op: str) -> dict:
+    reader, writer = await asyncio.open_connection(*address, limit=1 << 24)
+    writer.write(json.dumps({"id": 0, "op": op}).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    return response
+
+
+async def load(address, args, vertices: int) -> dict:
+    robots = [row[0] for row in (await request(address, "state"))["robots"]]
+    before = await request(address, "stats")
+    start = time.perf_counter()
+    deadline = start + args.duration
+    # Orders go to a fixed set of pick/drop stations, as in bench_suite
+    stations = random.Random(args.seed).sample(range(vertices), min(args.stations, vertices))
+    clients = [Client(address, args.window, robots, stations, args.seed + i) for i in range(args.clients)]
+    subscribers = [subscribe(address, i < args.slow_subscribers, deadline) for i in range(args.subscribers)]
+    results = await asyncio.gather(*(client.run(deadline) for client in clients), *subscribers)
+    wall = time.perf_counter() - start
+    after = await request(address, "stats")
+    latencies = sorted(latency for client in clients for latency in client.latencies)
+    return {"wall": wall, "latencies": latencies, "errors": sum(client.errors for client in clients),
+            "streams": results[len(clients):], "before": before, "after": after}
+
+
+def start_server(args, tmp: str):
+    path = os.path.join(tmp, "grid.json")
+    with open(path, "w") as f:
+        json.dump(grid_graph_data(args.size, args.size), f)
+    server = subprocess.Popen([sys.executable, "serve.py", "--graph", path, "--port", "0", "--robots", str(args.robots),
+                               "--timestep", str(args.timestep)], stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline()
+    if not line.startswith("Listening on "):
+        server.kill()
+        raise RuntimeError("serve.py did not start")
+    host, port = line.split()[-1].rsplit(":", 1)
+    return server, (host, int(port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the control server with pipelined assign requests")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="an already running serve.py (default: start one)")
+    parser.add_argument("--vertices", type=int, help="vertex count of the --connect server's graph")
+    parser.add_argument("--size", type=int, default=30, help="grid side length for the server started here")
+    parser.add_argument("--robots", type=int, default=200)
+    parser.add_argument("--timestep", type=float, default=TICK_SECONDS)
+    parser.add_argument("--stations", type=int, default=64, help="distinct task destinations")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--window", type=int, default=64, help="requests in flight per client")
+    parser.add_argument("--subscribers", type=int, default=4, help="state stream subscribers")
+    parser.add_argument("--slow-subscribers", type=int, default=2, help="of those, ones that never read")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.connect:
+            if args.vertices is None:
+                parser.error("--connect needs --vertices")
+            host, port = args.connect.rsplit(":", 1)
+            address, vertices = (host, int(port)), args.vertices
+        else:
+            server, address = start_server(args, tmp)
+            vertices = args.size * args.size
+        try:
+            result = asyncio.run(load(address, args, vertices))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    latencies, wall = result["latencies"], result["wall"]
+    n = len(latencies)
+    print(f"{args.clients} clients x {args.window} in flight, {args.subscribers} subscribers "
+          f"({args.slow_subscribers} never reading), {wall:.1f} s")
+    print(f"requests : {n} ({n / wall:.0f}/s), {result['errors']} refused (no path)")
+    print(f"latency  : p50 {latencies[n // 2] * 1e3:.1f} ms  p99 {latencies[int(n * 0.99)] * 1e3:.1f} ms  "
+          f"max {latencies[-1] * 1e3:.1f} ms")
+    for i, stream in enumerate(result["streams"]):
+        kind = "slow" if i < args.slow_subscribers else "live"
+        print(f"stream {i} ({kind}): {stream['frames']} frames ({stream['full']} full), {stream['bytes'] / 1e6:.1f} MB")
+    before, after = result["before"], result["after"]
+    ticks = after["tick"] - before["tick"]
+    stats = after["stats"]
+    print(f"simulation: {ticks} ticks in {wall:.1f} s, {ticks * args.timestep / wall * 100:.0f}% of real time; "
+          f"tick p99 {stats['timings']['tick.total']['p99'] * 1e3:.1f} ms")
+    batch = stats["timings"].get("server.batch", {"mean": 0.0})
+    print(f"server    : {stats['counters'].get('server.resyncs', 0)} subscriber resyncs, "
+          f"batch mean {batch['mean'] * 1e3:.2f} ms ({stats['counters']['server.requests']} requests in "
+          f"{batch.get('count', 0)} batches)")
+
+
+if __name__ == "__main__":
+    main()
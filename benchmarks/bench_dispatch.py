@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager
+from benchmarks.graphs import grid_graph_data
+
+
+def run(nav_graph: NavGraph, strategy: str, robot_count: int, orders: list, seed: int) -> dict:
+    rng = random.Random(seed)
+    fleet_manager = FleetManager(nav_graph)
+    for vertex in rng.sample(nav_graph.nodes, robot_count):
+        fleet_manager.spawn_robot(vertex)
+    robots = list(fleet_manager.robots.values())
+
+    pending = list(orders)
+    first_batch = 0.0
+    if strategy != "fifo":
+        if strategy == "greedy":
+            fleet_manager.optimal_assignment_limit = 0
+        start = time.perf_counter()
+        fleet_manager.dispatch_tasks(pending)
+        first_batch = time.perf_counter() - start
+        pending = []
+    start = time.perf_counter()
+    while pending or fleet_manager.task_queue or any(r.status in (RobotStatus.MOVING, RobotStatus.WAITING) for r in robots):
+        # One order at a time to the first idle robot, as GUI clicks do
+        for robot in fleet_manager.idle_robots():
+            if not pending:
+                break
+            fleet_manager.assign_task(robot.id, pending.pop(0))
+        fleet_manager.update()
+    return {"makespan": fleet_manager.sim_time, "completed": fleet_manager.tasks_completed,
+            "first_batch_ms": first_batch * 1e3, "wall": time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Burst dispatch: one-at-a-time FIFO vs greedy vs optimal matching")
+    parser.add_argument("--size", type=int, default=20, help="grid side length")
+    parser.add_argument("--robots", type=int, default=40)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    nav_graph = NavGraph.from_data(grid_graph_data(args.size, args.size))
+    order_rng = random.Random(args.seed + 1)
+    orders = [order_rng.choice(nav_graph.nodes) for _ in range(args.orders)]
+    print(f"{args.orders} orders, {args.robots} robots, {len(nav_graph.nodes)} vertices")
+    print(f"{'strategy':>9} {'makespan s':>11} {'completed':>10} {'first batch ms':>15} {'wall s':>7}")
+    for strategy in ("fifo", "greedy", "optimal"):
+        r = run(nav_graph, strategy, args.robots, orders, args.seed)
+        print(f"{strategy:>9} {r['makespan']:>11.1f} {r['completed']:>10} {r['first_batch_ms']:>15.1f} {r['wall']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
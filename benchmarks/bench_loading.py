@@ -0,0 +1,48 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from benchmarks.graphs import grid_graph_data
+
+# Runs in a fresh interpreter so module imports are part of the measurement
+LOAD_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from src.models.nav_graph import NavGraph
+imported = time.perf_counter()
+nav_graph = NavGraph(sys.argv[1], use_cache=sys.argv[2] == "1")
+loaded = time.perf_counter()
+nav_graph.get_shortest_path(nav_graph.nodes[0], nav_graph.nodes[-1])
+routed = time.perf_counter()
+print(imported - start, loaded - imported, routed - loaded, "networkx" in sys.modules)
+"""
+
+
+def load(json_path: str, use_cache: bool) -> list:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", LOAD_SCRIPT, json_path, "1" if use_cache else "0"],
+                         cwd=root, capture_output=True, text=True, check=True).stdout.split()
+    return [float(x) for x in out[:3]] + [out[3]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nav-graph startup: JSON parse vs binary cache")
+    parser.add_argument("--size", type=int, default=112, help="grid side length (112 gives about 50k lanes)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "nav_graph.json")
+        with open(json_path, "w") as f:
+            json.dump(grid_graph_data(args.size, args.size), f, indent=2)
+        print(f"{args.size}x{args.size} grid, {os.path.getsize(json_path) / 1e6:.1f} MB of JSON")
+        print(f"{'mode':>11} {'import s':>9} {'load s':>7} {'first route s':>14} {'networkx':>9}")
+        runs = [("json", False), ("cache build", True)] + [("cache hit", True)] * args.repeat
+        for mode, use_cache in runs:
+            imported, loaded, routed, networkx = load(json_path, use_cache)
+            print(f"{mode:>11} {imported:>9.3f} {loaded:>7.3f} {routed:>14.3f} {networkx:>9}")
+
+
+if __name__ == "__main__":
+    main()
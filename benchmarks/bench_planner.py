@@ -0,0 +1,49 @@
+import argparse
+import random
+import time
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager, TICK_SECONDS
+from benchmarks.graphs import grid_graph_data
+
+
+def run(nav_graph: NavGraph, planner: str, robot_count: int, duration: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    fleet_manager = FleetManager(nav_graph, planner=planner)
+    nodes = nav_graph.nodes
+    for vertex in rng.sample(nodes, robot_count):
+        fleet_manager.spawn_robot(vertex)
+
+    waiting_ticks = 0
+    ticks = int(round(duration / TICK_SECONDS))
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for robot in fleet_manager.robots.values():
+            if robot.status in (RobotStatus.IDLE, RobotStatus.TASK_COMPLETE):
+                fleet_manager.assign_task(robot.id, rng.choice([v for v in nodes if v != robot.current_vertex]))
+        fleet_manager.update()
+        waiting_ticks += len(fleet_manager.traffic_manager.pending)
+    elapsed = time.perf_counter() - start
+    return {"throughput": fleet_manager.tasks_completed / (fleet_manager.sim_time / 3600.0),
+            "waiting": waiting_ticks / (ticks * robot_count), "wall": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fleet throughput: reactive traffic negotiation vs cooperative planning")
+    parser.add_argument("--graph", help="nav graph JSON file (default: a generated grid)")
+    parser.add_argument("--size", type=int, default=8, help="grid side length")
+    parser.add_argument("--robots", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--duration", type=float, default=1800.0, help="simulated seconds per run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    nav_graph = NavGraph(args.graph) if args.graph else NavGraph.from_data(grid_graph_data(args.size, args.size))
+    print(f"{len(nav_graph.nodes)} vertices, {args.duration:.0f} simulated seconds per run")
+    print(f"{'robots':>7} {'planner':>12} {'tasks/hour':>11} {'waiting':>8} {'wall s':>7}")
+    for robot_count in args.robots:
+        for planner in ("reactive", "cooperative"):
+            r = run(nav_graph, planner, robot_count, args.duration, args.seed)
+            print(f"{robot_count:>7} {planner:>12} {r['throughput']:>11.1f} {r['waiting']:>8.1%} {r['wall']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
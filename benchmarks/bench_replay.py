@@ -0,0 +1,79 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager, RECORD_SNAPSHOT_TICKS
+from src.controllers.fleet_replay import FleetReplay
+from benchmarks.graphs import grid_graph_data
+
+
+def run(data: dict, robots: int, ticks: int, seed: int, record_path=None,
+        snapshot_interval: int = RECORD_SNAPSHOT_TICKS) -> float:
+    rng = random.Random(seed)
+    # A fresh graph per run, so no run inherits another's route caches
+    nav_graph = NavGraph.from_data(data)
+    fleet_manager = FleetManager(nav_graph)
+    if record_path:
+        fleet_manager.start_recording(record_path, snapshot_interval)
+    for vertex in rng.sample(nav_graph.nodes, robots):
+        fleet_manager.spawn_robot(vertex)
+    nodes = nav_graph.nodes
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if tick % 20 == 0:
+            for robot in fleet_manager.robots.values():
+                if robot.status in (RobotStatus.IDLE, RobotStatus.TASK_COMPLETE):
+                    fleet_manager.assign_task(robot.id, rng.choice([v for v in nodes if v != robot.current_vertex]))
+        fleet_manager.update()
+    wall = time.perf_counter() - start
+    fleet_manager.stop_recording()
+    return wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event recording overhead and replay seek time")
+    parser.add_argument("--size", type=int, default=30, help="grid side length")
+    parser.add_argument("--robots", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=6000)
+    parser.add_argument("--snapshot-interval", type=int, default=RECORD_SNAPSHOT_TICKS)
+    parser.add_argument("--seeks", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs, with and without recording")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    data = grid_graph_data(args.size, args.size)
+    nav_graph = NavGraph.from_data(data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.fleetlog")
+        plain, recorded = float("inf"), float("inf")
+        for _ in range(args.repeat):
+            plain = min(plain, run(data, args.robots, args.ticks, args.seed))
+            recorded = min(recorded, run(data, args.robots, args.ticks, args.seed, path, args.snapshot_interval))
+        size = os.path.getsize(path)
+        print(f"{args.robots} robots, {args.ticks} ticks on a {args.size}x{args.size} grid")
+        print(f"simulate          : {plain:.2f} s ({args.ticks / plain:.0f} ticks/s)")
+        print(f"simulate + record : {recorded:.2f} s ({(recorded / plain - 1) * 100:+.1f}%), "
+              f"log {size / 1e6:.1f} MB")
+
+        with FleetReplay(nav_graph, path) as replay:
+            rng = random.Random(args.seed)
+            targets = [rng.randint(replay.first_tick, replay.last_tick) for _ in range(args.seeks)]
+            start = time.perf_counter()
+            for tick in targets:
+                replay.seek(tick)
+            seek = (time.perf_counter() - start) / args.seeks
+            start = time.perf_counter()
+            replay.seek(replay.first_tick)
+            while replay.tick < replay.last_tick:
+                replay.update()
+            full = time.perf_counter() - start
+        resimulate = plain * sum(targets) / len(targets) / args.ticks
+        print(f"random seek       : {seek * 1e3:.1f} ms (re-simulating to the same ticks: {resimulate * 1e3:.0f} ms)")
+        print(f"replay every tick : {full:.2f} s ({args.ticks / full:.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
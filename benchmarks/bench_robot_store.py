@@ -0,0 +1,55 @@
+import argparse
+import random
+import time
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager
+from benchmarks.graphs import grid_graph_data
+
+
+def run(backend: str, robot_count: int, ticks: int, size: int, spacing: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    nav_graph = NavGraph.from_data(grid_graph_data(size, size, spacing=spacing), tree_cache_size=0)
+    fleet_manager = FleetManager(nav_graph, backend=backend)
+    nodes = nav_graph.nodes
+    for vertex in rng.sample(nodes, robot_count):
+        robot_id = fleet_manager.spawn_robot(vertex)
+        fleet_manager.assign_task(robot_id, rng.choice(nodes))
+
+    step_time = 0.0
+    for tick in range(ticks):
+        if tick % 20 == 0:
+            for robot in fleet_manager.robots.values():
+                if robot.status == RobotStatus.TASK_COMPLETE:
+                    fleet_manager.assign_task(robot.id, rng.choice(nodes))
+        start = time.perf_counter()
+        fleet_manager.update()
+        step_time += time.perf_counter() - start
+
+    positions_time = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fleet_manager.get_robot_positions()
+        positions_time = min(positions_time, time.perf_counter() - start)
+    moving = sum(r.status == RobotStatus.MOVING for r in fleet_manager.robots.values())
+    return {"hz": ticks / step_time, "positions_ms": positions_time * 1e3, "moving": moving,
+            "completed": fleet_manager.tasks_completed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Python objects vs NumPy structure-of-arrays robot stepping")
+    parser.add_argument("--robots", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--size", type=int, default=200, help="grid side length")
+    parser.add_argument("--spacing", type=float, default=2.0, help="lane length in metres")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"{args.robots} robots on a {args.size}x{args.size} grid, {args.ticks} ticks")
+    for backend in ("python", "numpy"):
+        r = run(backend, args.robots, args.ticks, args.size, args.spacing, args.seed)
+        print(f"{backend:>7}: {r['hz']:8.1f} ticks/s  get_robot_positions {r['positions_ms']:7.2f} ms  "
+              f"moving {r['moving']}  completed {r['completed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import random
+import time
+import networkx as nx
+from src.models.nav_graph import NavGraph
+from benchmarks.graphs import grid_graph_data
+
+
+def time_queries(fn, queries) -> float:
+    start = time.perf_counter()
+    for s, t in queries:
+        fn(s, t)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare NavGraph routing with plain networkx shortest_path")
+    parser.add_argument("--size", type=int, default=100, help="grid side length (size x size vertices)")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--destinations", type=int, default=50, help="distinct destinations (warehouse drop-off points)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    data = grid_graph_data(args.size, args.size)
+    nav_graph = NavGraph.from_data(data)
+    nodes = nav_graph.nodes
+    destinations = rng.sample(nodes, min(args.destinations, len(nodes)))
+    # Robots keep returning to a handful of stations, so starts repeat as well
+    starts = rng.sample(nodes, min(args.destinations * 4, len(nodes)))
+    queries = [(rng.choice(starts), rng.choice(destinations)) for _ in range(args.queries)]
+
+    baseline = time_queries(lambda s, t: nx.shortest_path(nav_graph.graph, s, t), queries)
+
+    start = time.perf_counter()
+    nav_graph.compile()
+    compile_time = time.perf_counter() - start
+    nav_graph.path_cache_size = 0
+    uncached = time_queries(nav_graph.get_shortest_path, queries)
+    nav_graph.path_cache_size = 4096
+    time_queries(nav_graph.get_shortest_path, queries)
+    cached = time_queries(nav_graph.get_shortest_path, queries)
+
+    n = len(queries)
+    print(f"graph: {len(nodes)} vertices, {len(nav_graph.edges)} lanes, {n} queries")
+    print(f"networkx shortest_path    : {baseline / n * 1e3:8.3f} ms/query")
+    print(f"CSR compile               : {compile_time * 1e3:8.3f} ms")
+    print(f"CSR routing, no path cache: {uncached / n * 1e3:8.3f} ms/query")
+    print(f"CSR routing, warm cache   : {cached / n * 1e3:8.3f} ms/query "
+          f"({nav_graph.cache_hits} hits / {nav_graph.cache_misses} misses)")
+
+
+if __name__ == "__main__":
+    main()
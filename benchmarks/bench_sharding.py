@@ -0,0 +1,77 @@
+import argparse
+import os
+import random
+import time
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager, TICK_SECONDS
+from src.controllers.sharded_simulation import ShardedSimulation
+from benchmarks.graphs import multi_level_grid_data
+
+
+def pick_destination(rng: random.Random, nav_graph: NavGraph, vertex: int, cross_level: float) -> int:
+    level = nav_graph.get_vertex_level(vertex)
+    if rng.random() < cross_level:
+        level = rng.choice(list(nav_graph.levels))
+    return rng.choice([v for v in nav_graph.levels[level] if v != vertex])
+
+
+def run_single(data: dict, robots_per_level: int, ticks: int, batch: int, cross_level: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    nav_graph = NavGraph.from_data(data)
+    fleet_manager = FleetManager(nav_graph)
+    for vertices in nav_graph.levels.values():
+        for vertex in rng.sample(vertices, robots_per_level):
+            fleet_manager.spawn_robot(vertex)
+    start = time.perf_counter()
+    for _ in range(ticks // batch):
+        for robot in fleet_manager.robots.values():
+            if robot.status in (RobotStatus.IDLE, RobotStatus.TASK_COMPLETE):
+                fleet_manager.assign_task(robot.id, pick_destination(rng, nav_graph, robot.current_vertex, cross_level))
+        for _ in range(batch):
+            fleet_manager.update()
+    elapsed = time.perf_counter() - start
+    return {"ticks_per_s": ticks / elapsed, "completed": fleet_manager.tasks_completed, "handoffs": 0}
+
+
+def run_sharded(data: dict, workers: int, robots_per_level: int, ticks: int, batch: int, cross_level: float,
+                seed: int) -> dict:
+    rng = random.Random(seed)
+    with ShardedSimulation(data, workers) as sim:
+        nav_graph = sim.nav_graph
+        for vertices in nav_graph.levels.values():
+            for vertex in rng.sample(vertices, robots_per_level):
+                sim.spawn_robot(vertex)
+        start = time.perf_counter()
+        for _ in range(ticks // batch):
+            sim.assign_tasks({robot_id: pick_destination(rng, nav_graph, sim.states[robot_id].vertex, cross_level)
+                              for robot_id in sim.idle_robots()})
+            sim.update(TICK_SECONDS, batch)
+        elapsed = time.perf_counter() - start
+        return {"ticks_per_s": ticks / elapsed, "completed": sim.tasks_completed, "handoffs": sim.handoffs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-process fleet vs level-sharded worker processes")
+    parser.add_argument("--levels", type=int, default=4)
+    parser.add_argument("--size", type=int, default=40, help="grid side length per level")
+    parser.add_argument("--robots", type=int, default=400, help="robots per level")
+    parser.add_argument("--ticks", type=int, default=400)
+    parser.add_argument("--batch", type=int, default=20, help="ticks per coordinator exchange")
+    parser.add_argument("--cross-level", type=float, default=0.1, help="share of tasks sent to a random level")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    data = multi_level_grid_data(args.levels, args.size, args.size)
+    print(f"{args.levels} levels of {args.size}x{args.size}, {args.robots} robots per level, {args.ticks} ticks, "
+          f"{os.cpu_count()} CPU(s)")
+    print(f"{'workers':>8} {'ticks/s':>9} {'completed':>10} {'handoffs':>9}")
+    r = run_single(data, args.robots, args.ticks, args.batch, args.cross_level, args.seed)
+    print(f"{'none':>8} {r['ticks_per_s']:>9.1f} {r['completed']:>10} {r['handoffs']:>9}")
+    for workers in args.workers:
+        r = run_sharded(data, workers, args.robots, args.ticks, args.batch, args.cross_level, args.seed)
+        print(f"{workers:>8} {r['ticks_per_s']:>9.1f} {r['completed']:>10} {r['handoffs']:>9}")
+
+
+if __name__ == "__main__":
+    main()
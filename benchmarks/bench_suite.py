@@ -0,0 +1,116 @@
+import argparse
+import json
+import math
+import random
+import resource
+import subprocess
+import sys
+import time
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager
+from benchmarks.graphs import grid_graph_data, warehouse_graph_data
+
+GRAPHS = {
+    "grid": lambda side: grid_graph_data(side, side),
+    "warehouse": lambda side: warehouse_graph_data(side, side),
+}
+# Metrics compared against a baseline, and whether a higher value is better
+TRACKED = {"ticks_per_s": True, "tick_p99_ms": False, "assign_mean_ms": False, "assign_p99_ms": False,
+           "memory_mb": False}
+
+
+def run_case(graph: str, robots: int, ticks: int, stations: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    # Four vertices per robot keeps traffic dense but moving
+    side = max(10, math.ceil(math.sqrt(4 * robots)))
+    nav_graph = NavGraph.from_data(GRAPHS[graph](side))
+    fleet_manager = FleetManager(nav_graph)
+    nodes = nav_graph.nodes
+    for vertex in rng.sample(nodes, robots):
+        fleet_manager.spawn_robot(vertex)
+    # Robots shuttle between a fixed set of pick/drop stations, as in a warehouse
+    targets = rng.sample(nodes, min(stations, len(nodes)))
+    tick_time = 0.0
+    for tick in range(ticks):
+        if tick % 20 == 0:
+            for robot in fleet_manager.robots.values():
+                if robot.status in (RobotStatus.IDLE, RobotStatus.TASK_COMPLETE):
+                    fleet_manager.assign_task(robot.id, rng.choice(targets))
+        start = time.perf_counter()
+        fleet_manager.update()
+        tick_time += time.perf_counter() - start
+    timings = fleet_manager.stats()["timings"]
+    assign = timings.get("assign.latency", {"mean": 0.0, "p99": 0.0})
+    return {"case": f"{graph}:{robots}", "vertices": len(nodes), "ticks_per_s": ticks / tick_time,
+            "tick_p99_ms": timings["tick.total"]["p99"] * 1e3,
+            "assign_mean_ms": assign["mean"] * 1e3, "assign_p99_ms": assign["p99"] * 1e3,
+            "memory_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "tasks_completed": fleet_manager.tasks_completed}
+
+
+def run_isolated(graph: str, robots: int, args) -> dict:
+    # A fresh interpreter per case: peak memory is the case's own and no cache carries over
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_suite", "--case", f"{graph}:{robots}",
+                             "--ticks", str(args.ticks), "--stations", str(args.stations), "--seed", str(args.seed)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def regressions(results: list, baseline: list, tolerance: float) -> list:
+    previous = {r["case"]: r for r in baseline}
+    found = []
+    for result in results:
+        old = previous.get(result["case"])
+        if old is None:
+            continue
+        for name, higher_is_better in TRACKED.items():
+            if not old.get(name):
+                continue
+            change = result[name] / old[name] - 1
+            if (-change if higher_is_better else change) > tolerance:
+                found.append(f"{result['case']}: {name} {old[name]:.3f} -> {result[name]:.3f} ({change * 100:+.0f}%)")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick rate, assignment latency and memory from 10 to 10,000 robots")
+    parser.add_argument("--graphs", nargs="+", choices=list(GRAPHS), default=list(GRAPHS))
+    parser.add_argument("--robots", nargs="+", type=int, default=[10, 100, 1000, 10000])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--stations", type=int, default=64, help="distinct task destinations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="save the results, e.g. as a baseline for --compare")
+    parser.add_argument("--compare", metavar="PATH", help="baseline results; exit non-zero on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative change before flagging")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.case:
+        graph, robots = args.case.split(":")
+        print(json.dumps(run_case(graph, int(robots), args.ticks, args.stations, args.seed)))
+        return
+
+    results = []
+    print(f"{'case':<16} {'vertices':>8} {'ticks/s':>9} {'tick p99':>10} {'assign mean':>12} "
+          f"{'assign p99':>11} {'memory':>9}")
+    for graph in args.graphs:
+        for robots in args.robots:
+            result = run_isolated(graph, robots, args)
+            results.append(result)
+            print(f"{result['case']:<16} {result['vertices']:>8} {result['ticks_per_s']:>9.1f} "
+                  f"{result['tick_p99_ms']:>7.2f} ms {result['assign_mean_ms']:>9.3f} ms "
+                  f"{result['assign_p99_ms']:>8.3f} ms {result['memory_mb']:>6.0f} MB", flush=True)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
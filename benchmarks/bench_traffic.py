@@ -0,0 +1,48 @@
+import argparse
+import random
+import time
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager
+from benchmarks.graphs import grid_graph_data
+
+
+def run(robot_count: int, ticks: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    # Keep roughly one robot per four vertices so traffic actually conflicts
+    size = max(4, int((robot_count * 4) ** 0.5))
+    nav_graph = NavGraph.from_data(grid_graph_data(size, size))
+    fleet_manager = FleetManager(nav_graph)
+    nodes = nav_graph.nodes
+    for vertex in rng.sample(nodes, robot_count):
+        fleet_manager.spawn_robot(vertex)
+
+    completed = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for robot in fleet_manager.robots.values():
+            if robot.status in (RobotStatus.IDLE, RobotStatus.TASK_COMPLETE):
+                if robot.status == RobotStatus.TASK_COMPLETE:
+                    completed += 1
+                fleet_manager.assign_task(robot.id, rng.choice(nodes))
+        fleet_manager.update()
+    elapsed = time.perf_counter() - start
+    waiting = sum(r.status == RobotStatus.WAITING for r in fleet_manager.robots.values())
+    return {"robots": robot_count, "ticks_per_s": ticks / elapsed, "us_per_robot_tick": elapsed / ticks / robot_count * 1e6,
+            "completed": completed, "waiting": waiting}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TrafficManager scaling with robot count")
+    parser.add_argument("--robots", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"{'robots':>7} {'ticks/s':>10} {'us/robot/tick':>14} {'completed':>10} {'waiting':>8}")
+    for robot_count in args.robots:
+        r = run(robot_count, args.ticks, args.seed)
+        print(f"{r['robots']:>7} {r['ticks_per_s']:>10.1f} {r['us_per_robot_tick']:>14.2f} {r['completed']:>10} {r['waiting']:>8}")
+
+
+if __name__ == "__main__":
+    main()
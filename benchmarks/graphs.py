@@ -0,0 +1,55 @@
+from typing import Dict
+
+
+def grid_graph_data(width: int, height: int, spacing: float = 1.0, speed_limit: float = 0) -> Dict:
+    """Nav-graph JSON data for a width x height grid with bidirectional lanes."""
+    vertices = []
+    lanes = []
+    for row in range(height):
+        for col in range(width):
+            vertices.append([col * spacing, row * spacing, {"name": f"v{row}_{col}"}])
+    for row in range(height):
+        for col in range(width):
+            v = row * width + col
+            neighbours = []
+            if col + 1 < width:
+                neighbours.append(v + 1)
+            if row + 1 < height:
+                neighbours.append(v + width)
+            for u in neighbours:
+                lanes.append([v, u, {"speed_limit": speed_limit}])
+                lanes.append([u, v, {"speed_limit": speed_limit}])
+    return {"building_name": "grid", "levels": {"level1": {"vertices": vertices, "lanes": lanes}}}
+
+
+def multi_level_grid_data(levels: int, width: int, height: int, lifts: int = 2, spacing: float = 1.0) -> Dict:
+    """`levels` copies of the grid, joined by `lifts` lift shafts spread along the first row."""
+    data = {"building_name": "tower", "levels": {}}
+    for level in range(levels):
+        grid = grid_graph_data(width, height, spacing)["levels"]["level1"]
+        for lift in range(lifts):
+            col = (lift + 1) * width // (lifts + 1)
+            grid["vertices"][col][2]["lift"] = f"lift{lift}"
+        data["levels"][f"level{level + 1}"] = grid
+    return data
+
+
+def warehouse_graph_data(aisles: int, depth: int, cross_every: int = 10, spacing: float = 1.0) -> Dict:
+    """Warehouse floor: `aisles` one-way rack aisles of `depth` vertices, alternating direction, joined by
+    two-way cross aisles on the first and last row and every `cross_every` rows between."""
+    vertices = []
+    lanes = []
+    for row in range(depth):
+        for col in range(aisles):
+            vertices.append([col * spacing, row * spacing, {"name": f"a{col}_{row}"}])
+    for row in range(depth):
+        cross = row % cross_every == 0 or row == depth - 1
+        for col in range(aisles):
+            v = row * aisles + col
+            if row + 1 < depth:
+                down = [v, v + aisles, {}]
+                lanes.append(down if col % 2 == 0 else [v + aisles, v, {}])
+            if cross and col + 1 < aisles:
+                lanes.append([v, v + 1, {}])
+                lanes.append([v + 1, v, {}])
+    return {"building_name": "warehouse", "levels": {"level1": {"vertices": vertices, "lanes": lanes}}}
@@ -3,6 +3,7 @@ import tkinter as tk
 from src.utils.logger import setup_logger
 from src.models.nav_graph import NavGraph
 from src.controllers.fleet_manager import FleetManager
+from src.controllers.simulation_engine import SimulationEngine
 from src.gui.fleet_gui import FleetGUI
 
 def main():
@@ -10,9 +11,14 @@ def main():
     setup_logger()
     nav_graph = NavGraph("data/nav_graph_1.json")
     fleet_manager = FleetManager(nav_graph)
+    engine = SimulationEngine(fleet_manager, stats_every=60.0)
     root = tk.Tk()
-    app = FleetGUI(root, nav_graph, fleet_manager)
-    root.mainloop()
+    app = FleetGUI(root, nav_graph, fleet_manager, engine)
+    engine.start()
+    try:
+        root.mainloop()
+    finally:
+        engine.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
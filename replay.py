@@ -0,0 +1,73 @@
+import argparse
+import time
+from src.models.nav_graph import NavGraph
+from src.controllers.fleet_manager import TICK_SECONDS
+from src.controllers.fleet_replay import FleetReplay
+from src.utils.event_log import EventKind
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Inspect or play back an event log written by simulate.py --record")
+    parser.add_argument("log", help="event log file")
+    parser.add_argument("--graph", default="data/nav_graph_1.json", help="nav graph JSON file the run used")
+    parser.add_argument("--tick", type=int, help="print the fleet state at this tick (default: the last tick)")
+    parser.add_argument("--events", nargs=2, type=int, metavar=("FROM", "TO"),
+                        help="list the events recorded between two ticks, inclusive")
+    parser.add_argument("--robot", type=int, help="only show this robot")
+    parser.add_argument("--gui", action="store_true", help="play the recording back in the GUI")
+    parser.add_argument("--speedup", type=float, default=1.0, help="playback speed multiplier with --gui")
+    parser.add_argument("--timestep", type=float, default=TICK_SECONDS,
+                        help="simulated seconds per tick, for pacing --gui playback")
+    return parser.parse_args()
+
+def print_events(replay: FleetReplay, first: int, last: int, robot_id=None):
+    reader = replay.reader
+    for event in reader.events(reader.snapshot_before(first)):
+        if event.tick > last:
+            break
+        if event.tick < first or (robot_id is not None and event.robot != robot_id):
+            continue
+        args = ", ".join(str(x) for x in (event.a, event.b, event.c) if x != -1)
+        value = f" {event.value:g}" if event.value else ""
+        print(f"{event.tick:>8} {EventKind(event.kind).name:<9} robot {event.robot:<5} {args}{value}")
+
+def print_state(replay: FleetReplay, robot_id=None):
+    print(f"tick {replay.tick}  t={replay.sim_time:.2f}s  robots: {len(replay.robots)}  "
+          f"tasks completed: {replay.tasks_completed}")
+    for state in replay.robot_states():
+        if robot_id is None or state.id == robot_id:
+            x, y = state.position
+            print(f"  robot {state.id:<5} {state.status:<13} vertex {state.vertex:<6} ({x:.3f}, {y:.3f}) {state.level}")
+
+def play(replay: FleetReplay, nav_graph: NavGraph, args):
+    import tkinter as tk
+    from src.controllers.simulation_engine import SimulationEngine
+    from src.gui.fleet_gui import FleetGUI
+    engine = SimulationEngine(replay, args.timestep, realtime=True, speedup=args.speedup)
+    root = tk.Tk()
+    FleetGUI(root, nav_graph, replay, engine)
+    engine.start()
+    try:
+        root.mainloop()
+    finally:
+        engine.stop()
+
+def main():
+    args = parse_args()
+    nav_graph = NavGraph(args.graph)
+    with FleetReplay(nav_graph, args.log) as replay:
+        print(f"{args.log}: ticks {replay.first_tick}-{replay.last_tick}, "
+              f"{len(replay.reader.snapshot_ticks)} snapshots")
+        if args.gui:
+            play(replay, nav_graph, args)
+            return
+        if args.events:
+            print_events(replay, args.events[0], args.events[1], args.robot)
+            return
+        start = time.perf_counter()
+        replay.seek(replay.last_tick if args.tick is None else args.tick)
+        elapsed = time.perf_counter() - start
+        print_state(replay, args.robot)
+        print(f"seek took {elapsed * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    main()
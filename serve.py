@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import random
+from src.utils.logger import setup_logger
+from src.models.nav_graph import NavGraph
+from src.controllers.fleet_manager import FleetManager, TICK_SECONDS
+from src.controllers.simulation_engine import SimulationEngine
+from src.controllers.control_server import ControlServer, PUBLISH_INTERVAL
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the fleet simulation behind the JSON-lines control API")
+    parser.add_argument("--graph", default="data/nav_graph_1.json", help="nav graph JSON file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (0 picks a free one)")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--robots", type=int, default=0, help="robots spawned at random free vertices on start")
+    parser.add_argument("--timestep", type=float, default=TICK_SECONDS, help="simulated seconds per step")
+    parser.add_argument("--speedup", type=float, default=1.0, help="wall-clock speed multiplier")
+    parser.add_argument("--backend", choices=["python", "numpy"], default="python")
+    parser.add_argument("--planner", choices=["reactive", "cooperative"], default="reactive")
+    parser.add_argument("--publish-interval", type=float, default=PUBLISH_INTERVAL,
+                        help="wall-clock seconds between state frames to subscribers")
+    parser.add_argument("--stats-every", type=float, help="log the stats report every this many simulated seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log", action="store_true", help="write logs/fleet_logs.txt")
+    return parser.parse_args()
+
+async def serve(server: ControlServer, args):
+    await server.start(args.host, args.port, args.unix)
+    print(f"Listening on {server.address}", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+def main():
+    args = parse_args()
+    if args.log:
+        setup_logger()
+    nav_graph = NavGraph(args.graph)
+    fleet_manager = FleetManager(nav_graph, backend=args.backend, planner=args.planner)
+    rng = random.Random(args.seed)
+    for vertex in rng.sample(nav_graph.nodes, len(nav_graph.nodes)):
+        if len(fleet_manager.robots) >= args.robots:
+            break
+        try:
+            fleet_manager.spawn_robot(vertex)
+        except RuntimeError:
+            continue
+    engine = SimulationEngine(fleet_manager, args.timestep, realtime=True, speedup=args.speedup,
+                              stats_every=args.stats_every)
+    engine.start()
+    try:
+        asyncio.run(serve(ControlServer(engine, args.publish_interval), args))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+
+if __name__ == "__main__":
+    main()
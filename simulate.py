@@ -0,0 +1,129 @@
+import argparse
+import json
+import random
+import time
+from src.utils.logger import setup_logger
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager, TICK_SECONDS
+from src.controllers.simulation_engine import SimulationEngine
+from src.controllers.sharded_simulation import ShardedSimulation
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the fleet simulation without a GUI")
+    parser.add_argument("--graph", default="data/nav_graph_1.json", help="nav graph JSON file")
+    parser.add_argument("--robots", type=int, default=4, help="robots spawned at random free vertices")
+    parser.add_argument("--duration", type=float, default=3600.0, help="simulated seconds to run")
+    parser.add_argument("--timestep", type=float, default=TICK_SECONDS, help="simulated seconds per step")
+    parser.add_argument("--realtime", action="store_true", help="pace steps against the wall clock")
+    parser.add_argument("--speedup", type=float, default=1.0, help="wall-clock speed multiplier with --realtime")
+    parser.add_argument("--report-every", type=float, default=600.0, help="simulated seconds between progress lines")
+    parser.add_argument("--backend", choices=["python", "numpy"], default="python",
+                        help="robot state storage; numpy steps all robots with array operations")
+    parser.add_argument("--planner", choices=["reactive", "cooperative"], default="reactive",
+                        help="cooperative reserves space-time slots so robots plan around each other")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="run levels in this many worker processes (0: one process, no sharding)")
+    parser.add_argument("--record", metavar="PATH", help="write a binary event log for replay.py")
+    parser.add_argument("--stats", action="store_true",
+                        help="print per-phase timings and traffic counters with each progress line")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log", action="store_true", help="write logs/fleet_logs.txt")
+    args = parser.parse_args()
+    if args.record and args.workers > 0:
+        parser.error("--record records a single process; it cannot be combined with --workers")
+    if args.stats and args.workers > 0:
+        parser.error("--stats reports a single process; it cannot be combined with --workers")
+    return args
+
+def spawn_fleet(fleet_manager: FleetManager, count: int, rng: random.Random):
+    for vertex in rng.sample(fleet_manager.nav_graph.nodes, len(fleet_manager.nav_graph.nodes)):
+        if len(fleet_manager.robots) >= count:
+            break
+        try:
+            fleet_manager.spawn_robot(vertex)
+        except RuntimeError:
+            continue
+
+def assign_random_tasks(fleet_manager: FleetManager, rng: random.Random):
+    nodes = fleet_manager.nav_graph.nodes
+    for robot in fleet_manager.robots.values():
+        if robot.status in (RobotStatus.IDLE, RobotStatus.TASK_COMPLETE):
+            fleet_manager.assign_task(robot.id, rng.choice(nodes))
+
+def print_stats(fleet_manager: FleetManager):
+    for line in fleet_manager.stats_report():
+        print(f"  {line}")
+
+def run_sharded(args, rng: random.Random):
+    with open(args.graph) as f:
+        data = json.load(f)
+    with ShardedSimulation(data, args.workers, backend=args.backend, planner=args.planner) as sim:
+        nodes = sim.nav_graph.nodes
+        for vertex in rng.sample(nodes, len(nodes)):
+            if len(sim.states) >= args.robots:
+                break
+            try:
+                sim.spawn_robot(vertex)
+            except RuntimeError:
+                continue
+        # Exchange robots between shards once per simulated second
+        total_steps = int(round(args.duration / args.timestep))
+        chunk_steps = max(1, int(round(1.0 / args.timestep)))
+        start = time.perf_counter()
+        done = 0
+        while done < total_steps:
+            sim.assign_tasks({robot_id: rng.choice([v for v in nodes if v != sim.states[robot_id].vertex])
+                              for robot_id in sim.idle_robots()})
+            steps = min(chunk_steps, total_steps - done)
+            sim.update(args.timestep, steps)
+            done += steps
+        wall = time.perf_counter() - start
+        hours = sim.sim_time / 3600.0
+        print(f"robots: {len(sim.states)}  workers: {len(set(sim.shard_of_level.values()))}  "
+              f"simulated: {sim.sim_time:.1f}s  wall: {wall:.2f}s  speed: {sim.sim_time / wall:.1f}x real time")
+        print(f"tasks completed: {sim.tasks_completed}  lift handoffs: {sim.handoffs}  "
+              f"throughput: {sim.tasks_completed / hours:.1f} tasks/hour")
+
+def main():
+    args = parse_args()
+    if args.log:
+        setup_logger()
+    rng = random.Random(args.seed)
+    if args.workers > 0:
+        run_sharded(args, rng)
+        return
+    nav_graph = NavGraph(args.graph)
+    fleet_manager = FleetManager(nav_graph, backend=args.backend, planner=args.planner)
+    if args.record:
+        fleet_manager.start_recording(args.record)
+    spawn_fleet(fleet_manager, args.robots, rng)
+    engine = SimulationEngine(fleet_manager, args.timestep, realtime=args.realtime, speedup=args.speedup)
+
+    # Hand out new random destinations between one-second chunks of simulated time
+    total_steps = int(round(args.duration / args.timestep))
+    chunk_steps = max(1, int(round(1.0 / args.timestep)))
+    report_steps = max(1, int(round(args.report_every / args.timestep)))
+    done = 0
+    start = time.perf_counter()
+    while done < total_steps:
+        with engine.lock:
+            assign_random_tasks(fleet_manager, rng)
+        done += engine.run(steps=min(chunk_steps, total_steps - done))
+        if done % report_steps < chunk_steps and done < total_steps:
+            print(f"t={fleet_manager.sim_time:8.1f}s tasks={fleet_manager.tasks_completed}")
+            if args.stats:
+                print_stats(fleet_manager)
+    wall = time.perf_counter() - start
+    fleet_manager.stop_recording()
+
+    hours = fleet_manager.sim_time / 3600.0
+    print(f"robots: {len(fleet_manager.robots)}  simulated: {fleet_manager.sim_time:.1f}s  wall: {wall:.2f}s  "
+          f"speed: {fleet_manager.sim_time / wall:.1f}x real time")
+    print(f"tasks completed: {fleet_manager.tasks_completed}  "
+          f"throughput: {fleet_manager.tasks_completed / hours:.1f} tasks/hour")
+    if args.stats:
+        print_stats(fleet_manager)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import socket
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from src.controllers.fleet_manager import RobotState
+from src.controllers.simulation_engine import SimulationEngine
+from src.utils.logger import log
+from src.utils.metrics import Metrics
+
+# Wall-clock seconds between state frames sent to subscribers
+PUBLISH_INTERVAL = 0.1
+# Frames queued for one subscriber before it is dropped to a full resync
+MAX_PENDING_FRAMES = 16
+# Kernel send buffer for subscriber sockets; a larger one would hide a slow client behind megabytes of stale frames
+SUBSCRIBER_SEND_BUFFER = 256 * 1024
+# Requests a connection may have outstanding before the server stops reading from it
+MAX_INFLIGHT = 256
+# Requests applied under one acquisition of the engine lock
+MAX_BATCH = 1024
+# Longest request line accepted
+MAX_LINE_BYTES = 1 << 20
+
+def encode_robot(state: RobotState) -> list:
+    x, y = state.position
+    return [state.id, round(x, 3), round(y, 3), state.level, state.vertex, state.status]
+
+def encode_line(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+def int_field(request: Dict[str, Any], name: str) -> int:
+    """request[name] if it is a JSON integer; floats, booleans and strings are refused rather than converted."""
+    value = request[name]
+    if type(value) is not int:
+        raise ValueError(f"Field {name!r} must be an integer")
+    return value
+
+class Subscriber:
+    __slots__ = ('writer', 'frames', 'ready', 'resync', 'task')
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.frames: Deque[bytes] = deque()
+        self.ready = asyncio.Event()
+        # A new subscriber starts from a full frame, as does one that fell too far behind
+        self.resync = True
+        self.task: Optional[asyncio.Task] = None
+
+class ControlServer:
+    """asyncio control API for a fleet driven by a SimulationEngine, over TCP or a Unix socket.
+
+    Clients send one JSON object per line, e.g. {"id": 1, "op": "assign",
+    "robot": 3, "vertex": 12}, and get {"id": 1, "ok": true, ...} back in
+    request order. Ops: spawn, assign, dispatch, remove, state, stats,
+    subscribe and unsubscribe.
+
+    Requests from all connections are applied in batches, one engine lock
+    acquisition per batch, on a single worker thread, so the event loop
+    never waits for a simulation step. Every publish_interval the robots
+    changed since the last frame are encoded once and queued for each
+    subscriber: [id, x, y, level, vertex, status] rows plus the ids of
+    removed robots. A subscriber more than max_pending frames behind loses
+    its queue and gets one full frame instead, so slow clients cost neither
+    the simulation nor other clients anything.
+    """
+
+    def __init__(self, engine: SimulationEngine, publish_interval: float = PUBLISH_INTERVAL,
+                 max_pending: int = MAX_PENDING_FRAMES, max_inflight: int = MAX_INFLIGHT,
+                 max_batch: int = MAX_BATCH):
+        self.engine = engine
+        self.fleet_manager = engine.fleet_manager
+        self.publish_interval = publish_interval
+        self.max_pending = max_pending
+        self.max_inflight = max_inflight
+        self.max_batch = max_batch
+        self.metrics = Metrics()
+        engine.add_metrics(self.metrics)
+        self.subscribers: Dict[asyncio.StreamWriter, Subscriber] = {}
+        self._commands: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: List[asyncio.Task] = []
+        # Connection handler task -> its writer
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="control")
+        # Last published version and robot rows; only touched on the worker thread
+        self._version = 0
+        self._state: Dict[int, list] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None):
+        """Listen on host:port (port 0 picks a free one), or on a Unix socket at path."""
+        self._commands = asyncio.Queue()
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path, limit=MAX_LINE_BYTES)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_LINE_BYTES)
+        self._tasks = [asyncio.create_task(self._apply_commands()), asyncio.create_task(self._publish())]
+        log(f"Control server listening on {self.address}")
+
+    @property
+    def address(self) -> str:
+        name = self._server.sockets[0].getsockname()
+        return name if isinstance(name, str) else f"{name[0]}:{name[1]}"
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        for task in self._tasks + list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._executor.shutdown()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections[asyncio.current_task()] = writer
+        responses: asyncio.Queue = asyncio.Queue(self.max_inflight)
+        responder = asyncio.create_task(self._respond(responses, writer, asyncio.current_task()))
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than MAX_LINE_BYTES; the stream cannot be resynchronised
+                    break
+                if not line:
+                    break
+                future = asyncio.get_running_loop().create_future()
+                request, error = self._parse(line)
+                if error is not None:
+                    future.set_result({"id": None, "ok": False, "error": error})
+                elif request["op"] in ("subscribe", "unsubscribe"):
+                    future.set_result(self._subscription(request, writer))
+                else:
+                    self._commands.put_nowait((request, future))
+                # Blocks once max_inflight answers are waiting to be written
+                await responses.put(future)
+            await responses.join()
+        except ConnectionError:
+            pass
+        finally:
+            responder.cancel()
+            self._unsubscribe(writer)
+            writer.close()
+            self._connections.pop(asyncio.current_task(), None)
+
+    @staticmethod
+    def _parse(line: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return None, "Malformed JSON"
+        if not isinstance(request, dict) or not isinstance(request.get("op"), str):
+            return None, "Expected an object with an 'op' string"
+        return request, None
+
+    async def _respond(self, responses: asyncio.Queue, writer: asyncio.StreamWriter, handler: asyncio.Task):
+        try:
+            while True:
+                future = await responses.get()
+                writer.write(encode_line(await future))
+                # Returns at once below the transport's high-water mark; a client that stops reading stalls here,
+                # so its queue fills and the handler stops reading its requests
+                await writer.drain()
+                responses.task_done()
+        except ConnectionError:
+            # The handler may be blocked on a full queue; nothing more can be answered
+            handler.cancel()
+
+    def _subscription(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> Dict[str, Any]:
+        if request["op"] == "unsubscribe":
+            self._unsubscribe(writer)
+        elif writer not in self.subscribers:
+            sock = writer.get_extra_info('socket')
+            if sock is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SUBSCRIBER_SEND_BUFFER)
+            subscriber = Subscriber(writer)
+            subscriber.task = asyncio.create_task(self._stream(subscriber))
+            self.subscribers[writer] = subscriber
+        return {"id": request.get("id"), "ok": True}
+
+    def _unsubscribe(self, writer: asyncio.StreamWriter):
+        subscriber = self.subscribers.pop(writer, None)
+        if subscriber is not None:
+            subscriber.task.cancel()
+
+    async def _stream(self, subscriber: Subscriber):
+        try:
+            while True:
+                await subscriber.ready.wait()
+                subscriber.ready.clear()
+                while subscriber.frames:
+                    subscriber.writer.write(subscriber.frames.popleft())
+                    await subscriber.writer.drain()
+        except ConnectionError:
+            self.subscribers.pop(subscriber.writer, None)
+
+    async def _apply_commands(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._commands.get()]
+            while len(batch) < self.max_batch and not self._commands.empty():
+                batch.append(self._commands.get_nowait())
+            requests = [request for request, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self._apply, requests)
+            except Exception as e:
+                # Every request still gets an answer, and this task lives on to apply the next batch
+                log(f"Control server: batch of {len(requests)} request(s) failed: {e!r}")
+                results = [{"id": request.get("id"), "ok": False, "error": "Internal error"} for request in requests]
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _apply(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        results = []
+        with self.engine.lock:
+            locked = time.perf_counter()
+            for request in requests:
+                result = {"id": request.get("id"), "ok": True}
+                try:
+                    result.update(self._execute(request))
+                except KeyError as e:
+                    result.update(ok=False, error=f"Missing field {e}")
+                except (ValueError, RuntimeError, TypeError) as e:
+                    result.update(ok=False, error=str(e))
+                except Exception as e:
+                    log(f"Control server: {request['op']} request {request.get('id')!r} failed: {e!r}")
+                    self.metrics.count('server.internal_errors')
+                    result.update(ok=False, error="Internal error")
+                results.append(result)
+        self.metrics.observe('server.lock_wait', locked - start)
+        self.metrics.observe('server.batch', time.perf_counter() - locked)
+        self.metrics.count('server.requests', len(requests))
+        return results
+
+    def _execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op, fleet_manager = request["op"], self.fleet_manager
+        if op == "spawn":
+            max_speed = request.get("max_speed")
+            if max_speed is not None and type(max_speed) not in (int, float):
+                raise ValueError("Field 'max_speed' must be a number")
+            return {"robot": fleet_manager.spawn_robot(int_field(request, "vertex"), max_speed=max_speed)}
+        if op == "assign":
+            robot_id, vertex = int_field(request, "robot"), int_field(request, "vertex")
+            if not fleet_manager.assign_task(robot_id, vertex):
+                raise ValueError(f"Robot {robot_id} cannot reach vertex {vertex}" if robot_id in fleet_manager.robots
+                                 else f"Unknown robot {robot_id}")
+            return {}
+        if op == "dispatch":
+            vertices = request["vertices"]
+            if not isinstance(vertices, list) or any(type(v) is not int for v in vertices):
+                raise ValueError("Field 'vertices' must be a list of integers")
+            assignments = fleet_manager.dispatch_tasks(vertices)
+            return {"assignments": [[robot_id, vertex] for robot_id, vertex in assignments.items()],
+                    "queued": len(fleet_manager.task_queue)}
+        if op == "remove":
+            robot_id = int_field(request, "robot")
+            if robot_id not in fleet_manager.robots:
+                raise ValueError(f"Unknown robot {robot_id}")
+            fleet_manager.remove_robot(robot_id)
+            return {}
+        if op == "state":
+            snapshot = fleet_manager.snapshot()
+            return {"tick": snapshot.tick, "time": snapshot.sim_time,
+                    "robots": [encode_robot(state) for state in snapshot.robots.values()]}
+        if op == "stats":
+            self.metrics.gauge('server.subscribers', len(self.subscribers))
+            return {"tick": fleet_manager.tick, "time": fleet_manager.sim_time,
+                    "stats": self.engine.stats()}
+        raise ValueError(f"Unknown op {op!r}")
+
+    async def _publish(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            if not self.subscribers:
+                continue
+            full = any(subscriber.resync for subscriber in self.subscribers.values())
+            delta, snapshot = await loop.run_in_executor(self._executor, self._collect, full)
+            for subscriber in list(self.subscribers.values()):
+                if subscriber.resync:
+                    # The full frame already includes this delta
+                    subscriber.frames.clear()
+                    subscriber.frames.append(snapshot)
+                    subscriber.resync = False
+                elif delta is None:
+                    continue
+                elif len(subscriber.frames) >= self.max_pending:
+                    subscriber.frames.clear()
+                    subscriber.resync = True
+                    self.metrics.count('server.resyncs')
+                    continue
+                else:
+                    subscriber.frames.append(delta)
+                subscriber.ready.set()
+
+    def _collect(self, full: bool) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Encoded delta since the previous call (None if nothing changed) and, if asked, a full frame."""
+        start = time.perf_counter()
+        with self.engine.lock:
+            snapshot = self.fleet_manager.snapshot(self._version)
+        self._version = snapshot.version
+        # Robots spawned and removed between two frames were never sent
+        removed = [robot_id for robot_id in snapshot.removed if robot_id in self._state]
+        rows = [encode_robot(state) for state in snapshot.robots.values()]
+        for robot_id in removed:
+            del self._state[robot_id]
+        for row in rows:
+            self._state[row[0]] = row
+        header = {"type": "state", "version": snapshot.version, "tick": snapshot.tick, "time": snapshot.sim_time}
+        delta = encode_line({**header, "full": False, "robots": rows, "removed": removed}) if rows or removed else None
+        whole = encode_line({**header, "full": True, "robots": list(self._state.values()), "removed": []}) \
+            if full else None
+        self.metrics.observe('server.publish', time.perf_counter() - start)
+        return delta, whole
@@ -0,0 +1,214 @@
+import heapq
+import math
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from src.models.nav_graph import NavGraph
+
+# Seconds per reservation slot
+SLOT_SECONDS = 0.5
+# Seconds of each plan that are reserved; the rest of the route follows the plain shortest path
+WINDOW_SECONDS = 20.0
+# Extra slots a robot keeps a vertex after it is due to leave, to absorb tick rounding
+MARGIN_SLOTS = 1
+# Search cost, in seconds, of driving through a vertex where another robot is parked
+PARKED_PENALTY = 2.0
+
+class Plan(NamedTuple):
+    path: List[int]
+    edge_times: List[float]
+    # Simulated time at which the unreserved rest of the route should be replanned (None if fully reserved)
+    replan_time: Optional[float]
+
+class ReservationTable:
+    """Space-time reservations: (vertex, slot) -> robot id.
+
+    Like TrafficManager, a robot on lane (u, v) holds both ends for the whole
+    traversal, so head-on and following conflicts are both vertex conflicts.
+    A robot standing still (idle, done, or between plans) is parked on its
+    vertex from a slot on, with no end, until its next plan.
+    """
+
+    def __init__(self):
+        self.slots: Dict[Tuple[int, int], int] = {}
+        self.robot_slots: Dict[int, List[Tuple[int, int]]] = {}
+        # vertex -> {robot id: first parked slot}, and robot id -> parked vertex
+        self.parked_at: Dict[int, Dict[int, int]] = {}
+        self.robot_parking: Dict[int, int] = {}
+
+    def is_free(self, vertex: int, start: int, end: int, robot_id: int) -> bool:
+        for slot in range(start, end):
+            holder = self.slots.get((vertex, slot))
+            if holder is not None and holder != robot_id:
+                return False
+        return True
+
+    def reserve(self, vertex: int, start: int, end: int, robot_id: int):
+        owned = self.robot_slots.setdefault(robot_id, [])
+        for slot in range(start, end):
+            key = (vertex, slot)
+            if key not in self.slots:
+                self.slots[key] = robot_id
+                owned.append(key)
+
+    def park(self, vertex: int, start: int, robot_id: int):
+        self.unpark(robot_id)
+        self.parked_at.setdefault(vertex, {})[robot_id] = start
+        self.robot_parking[robot_id] = vertex
+
+    def is_parked(self, vertex: int, end: int, robot_id: int) -> bool:
+        """Whether another robot is parked on vertex before slot end."""
+        parked = self.parked_at.get(vertex)
+        return parked is not None and any(holder != robot_id and since < end for holder, since in parked.items())
+
+    def unpark(self, robot_id: int):
+        vertex = self.robot_parking.pop(robot_id, None)
+        if vertex is not None:
+            parked = self.parked_at[vertex]
+            del parked[robot_id]
+            if not parked:
+                del self.parked_at[vertex]
+
+    def release(self, robot_id: int):
+        self.unpark(robot_id)
+        for key in self.robot_slots.pop(robot_id, ()):
+            if self.slots.get(key) == robot_id:
+                del self.slots[key]
+
+class CooperativePlanner:
+    """Windowed cooperative A* (WHCA*) over a shared reservation table.
+
+    Robots are planned one at a time in space-time: each step either waits a
+    slot or drives a lane, and only slots nobody else reserved are used. The
+    search is bounded to `window` seconds; from the window edge the route
+    continues along the shortest path and is replanned once the robot is
+    halfway through the window. The heuristic is the exact free-flow travel
+    time to the goal, so the search only explores detours and waits.
+
+    Parked robots are soft obstacles: driving through one costs PARKED_PENALTY
+    extra, so plans go around them where a detour is cheaper. They are not
+    forbidden, since TrafficManager lets robots pass idle ones, and on a map
+    that is a single loop no route would be left.
+    """
+
+    def __init__(self, nav_graph: NavGraph, slot_seconds: float = SLOT_SECONDS, window: float = WINDOW_SECONDS,
+                 max_expansions: int = 20000, heuristic_cache_size: int = 64):
+        self.nav_graph = nav_graph
+        self.slot_seconds = slot_seconds
+        self.window_slots = max(1, int(round(window / slot_seconds)))
+        self.max_expansions = max_expansions
+        self.heuristic_cache_size = heuristic_cache_size
+        self.table = ReservationTable()
+        self._heuristics: "OrderedDict[int, Dict[int, float]]" = OrderedDict()
+        self._moves: Dict[Tuple[int, Optional[float]], List[Tuple[int, int]]] = {}
+        self._graph_version = nav_graph.version
+
+    def _sync_graph(self):
+        if self._graph_version != self.nav_graph.version:
+            self._heuristics.clear()
+            self._moves.clear()
+            self._graph_version = self.nav_graph.version
+
+    def _heuristic(self, goal: int) -> Dict[int, float]:
+        times = self._heuristics.get(goal)
+        if times is not None:
+            self._heuristics.move_to_end(goal)
+            return times
+        times = self.nav_graph.get_times_to(goal)
+        self._heuristics[goal] = times
+        if len(self._heuristics) > self.heuristic_cache_size:
+            self._heuristics.popitem(last=False)
+        return times
+
+    def _lanes_from(self, vertex: int, max_speed: Optional[float]) -> List[Tuple[int, int]]:
+        # Lanes out of vertex with their traversal time rounded up to whole slots
+        key = (vertex, max_speed)
+        moves = self._moves.get(key)
+        if moves is None:
+            moves = [(v, max(1, math.ceil(self.nav_graph.get_traversal_time(vertex, v, max_speed) / self.slot_seconds - 1e-9)))
+                     for v in self.nav_graph.get_neighbors(vertex)]
+            self._moves[key] = moves
+        return moves
+
+    def release(self, robot_id: int):
+        self.table.release(robot_id)
+
+    def park(self, robot_id: int, vertex: int, now: float):
+        """Drop robot_id's reservations and hold vertex for it from simulated time now until its next plan."""
+        self.table.release(robot_id)
+        self.table.park(vertex, int(now / self.slot_seconds), robot_id)
+
+    def plan(self, robot_id: int, start: int, goal: int, now: float, max_speed: Optional[float] = None) -> Optional[Plan]:
+        """Reserve a route for robot_id from start (at simulated time now) to goal.
+
+        The search treats the robot's own reservations as free, and they are
+        only replaced once a plan is found. Returns None, leaving the table
+        untouched, when the goal is unreachable or the search gives up after
+        max_expansions.
+        """
+        self._sync_graph()
+        times = self._heuristic(goal)
+        if start not in times:
+            return None
+        table, res, margin = self.table, self.slot_seconds, MARGIN_SLOTS
+        penalty = PARKED_PENALTY / res
+        first = int(now / res)
+        horizon = first + self.window_slots
+        parent: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {(start, first): None}
+        # (priority, slot, vertex, parked-robot penalty so far)
+        heap = [(times[start] / res, first, start, 0.0)]
+        expansions = 0
+        while heap:
+            _, slot, u, cost = heapq.heappop(heap)
+            if u == goal or slot >= horizon:
+                return self._commit(robot_id, parent, (u, slot), goal, max_speed)
+            expansions += 1
+            if expansions > self.max_expansions:
+                return None
+            # The robot already stands on start, so holding it for the first slot or leaving it is never a conflict
+            holding = slot == first and u == start
+            if (u, slot + 1) not in parent and (holding or table.is_free(u, slot, slot + 1 + margin, robot_id)):
+                parent[(u, slot + 1)] = (u, slot)
+                heapq.heappush(heap, (slot + 1 + cost + times[u] / res, slot + 1, u, cost))
+            for v, duration in self._lanes_from(u, max_speed):
+                arrival = slot + duration
+                if v not in times or (v, arrival) in parent:
+                    continue
+                end = arrival + margin
+                if (holding or table.is_free(u, slot, end, robot_id)) and table.is_free(v, slot, end, robot_id):
+                    parent[(v, arrival)] = (u, slot)
+                    # Sharing the goal with a parked robot is allowed; only driving through one costs extra
+                    extra = penalty if v != goal and table.is_parked(v, end, robot_id) else 0.0
+                    heapq.heappush(heap, (arrival + cost + extra + times[v] / res, arrival, v, cost + extra))
+        return None
+
+    def _commit(self, robot_id: int, parent: Dict, state: Tuple[int, int], goal: int,
+                max_speed: Optional[float]) -> Plan:
+        states = []
+        while state is not None:
+            states.append(state)
+            state = parent[state]
+        states.reverse()
+
+        self.release(robot_id)
+        res = self.slot_seconds
+        path = [states[0][0]]
+        edge_times: List[float] = []
+        for (u, t1), (v, t2) in zip(states, states[1:]):
+            self.table.reserve(u, t1, t2 + MARGIN_SLOTS, robot_id)
+            self.table.reserve(v, t1, t2 + MARGIN_SLOTS, robot_id)
+            # Waits are self-loop steps; consecutive waits merge into one
+            if u == v and len(path) > 1 and path[-2] == path[-1]:
+                edge_times[-1] += res
+            else:
+                path.append(v)
+                edge_times.append((t2 - t1) * res)
+
+        last, slot = states[-1]
+        if last == goal:
+            # Hold the goal from arrival until the robot's next plan
+            self.table.park(goal, slot, robot_id)
+            return Plan(path, edge_times, None)
+        tail = self.nav_graph.get_shortest_path(last, goal)
+        path.extend(tail[1:])
+        edge_times.extend(self.nav_graph.get_traversal_time(u, v, max_speed) for u, v in zip(tail, tail[1:]))
+        return Plan(path, edge_times, (states[0][1] + self.window_slots // 2) * res)
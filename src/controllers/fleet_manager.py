@@ -1,55 +1,427 @@
-from typing import Dict
+import math
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
 from src.models.robot import Robot, RobotStatus
 from src.models.nav_graph import NavGraph
+from src.models.robot_store import STATUS_CODES, ArrayRobotStore, RobotStore
 from src.controllers.traffic_manager import TrafficManager
+from src.controllers.cooperative_planner import CooperativePlanner
+from src.utils.assignment import greedy_assignment, hungarian
+from src.utils.event_log import EventKind, EventLogWriter
 from src.utils.logger import log
+from src.utils.metrics import Metrics, format_report, merge_snapshots
+from src.utils.spatial_index import SpatialGrid
+
+# Simulated seconds advanced by one update() call
+TICK_SECONDS = 0.05
+# A vertex counts as occupied while any robot is within this distance of it
+ROBOT_CLEARANCE = 0.5
+ROBOT_INDEX_CELL_SIZE = 2.0
+# With the cooperative planner, a robot queued this long in TrafficManager gets a fresh plan
+REPLAN_AFTER_WAIT = 2.0
+# Batches with more robot-task pairs than this are matched greedily instead of optimally
+OPTIMAL_ASSIGNMENT_LIMIT = 40000
+# Queued tasks considered per idle robot, so old tasks are not overtaken indefinitely
+DISPATCH_LOOKAHEAD = 2
+# Ticks between full state snapshots in an event log; replay re-applies at most this many ticks of events
+RECORD_SNAPSHOT_TICKS = 200
+
+class RobotState(NamedTuple):
+    id: int
+    position: Tuple[float, float]
+    level: str
+    vertex: int
+    status: str
+    color: str
+
+class FleetSnapshot(NamedTuple):
+    version: int
+    tick: int
+    sim_time: float
+    # Only robots that changed after the version the snapshot was requested for
+    robots: Dict[int, RobotState]
+    # Ids of robots removed after that version and not in the fleet now
+    removed: List[int]
+
+BACKENDS = {"python": RobotStore, "numpy": ArrayRobotStore}
+PLANNERS = ("reactive", "cooperative")
 
 class FleetManager:
-    def __init__(self, nav_graph: NavGraph):
-        self.robots: Dict[int, Robot] = {}
+    def __init__(self, nav_graph: NavGraph, backend: str = "python", planner: str = "reactive"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown robot backend {backend}")
+        if planner not in PLANNERS:
+            raise ValueError(f"Unknown planner {planner}")
         self.nav_graph = nav_graph
-        self.traffic_manager = TrafficManager()
+        self.store = BACKENDS[backend](nav_graph)
+        self.robots: Dict[int, Robot] = self.store.robots
+        # tick.*, assign.*, plan.* and traffic.* instrumentation; routing has its own in nav_graph.metrics
+        self.metrics = Metrics()
+        self.traffic_manager = TrafficManager(self.metrics)
+        # Reactive routing plans every robot alone and leaves conflicts to TrafficManager
+        self.planner = CooperativePlanner(nav_graph) if planner == "cooperative" else None
+        self._replan_at: Dict[int, float] = {}
+        self._waiting_since: Dict[int, float] = {}
         self.next_robot_id = 0
+        # Robot positions are pushed into the grids lazily, just before a spatial query
+        self._robot_index = {level: SpatialGrid(ROBOT_INDEX_CELL_SIZE) for level in nav_graph.levels}
+        self._indexed_levels: Dict[int, str] = {}
+        self._index_version = 0
+        self.tick = 0
+        self.sim_time = 0.0
+        self.tasks_completed = 0
+        # Destinations waiting for an idle robot, oldest first
+        self.task_queue: Deque[int] = deque()
+        self.optimal_assignment_limit = OPTIMAL_ASSIGNMENT_LIMIT
+        self.recorder: Optional[EventLogWriter] = None
+
+    def spawn_robot(self, vertex: int, robot_id: Optional[int] = None, max_speed: Optional[float] = None) -> int:
+        """Place a new robot on vertex; robot_id is chosen here unless the caller hands one over.
 
-    def spawn_robot(self, vertex: int) -> int:
-        if vertex not in self.nav_graph.nodes:
+        max_speed (m/s) caps the robot on lanes whose speed limit is higher.
+        """
+        if not self.nav_graph.has_vertex(vertex):
             raise ValueError(f"Invalid vertex {vertex}")
-        if any(r.current_vertex == vertex for r in self.robots.values()):
+        if max_speed is not None and not max_speed > 0:
+            raise ValueError(f"Invalid max speed {max_speed}")
+        level = self.nav_graph.get_vertex_level(vertex)
+        if self.robots_within(self.nav_graph.get_vertex_position(vertex), ROBOT_CLEARANCE, level):
             raise RuntimeError(f"Vertex {vertex} is occupied")
-        robot_id = self.next_robot_id
-        self.robots[robot_id] = Robot(robot_id, vertex)
-        self.next_robot_id += 1
+        if robot_id is None:
+            robot_id = self.next_robot_id
+        elif robot_id in self.robots:
+            raise ValueError(f"Robot {robot_id} already exists")
+        robot = self.store.add(robot_id, vertex, max_speed)
+        self.next_robot_id = max(self.next_robot_id, robot_id + 1)
+        self._indexed_levels[robot_id] = level
+        self.store.mark_changed(robot)
+        if self.planner is not None:
+            self.planner.park(robot_id, vertex, self.sim_time)
+        if self.recorder is not None:
+            self.recorder.emit(EventKind.SPAWN, robot_id, vertex)
         log(f"Robot {robot_id} spawned at vertex {vertex}")
+        if self.task_queue:
+            self._dispatch_queue()
         return robot_id
 
     def assign_task(self, robot_id: int, destination: int) -> bool:
         if robot_id not in self.robots:
             return False
         robot = self.robots[robot_id]
-        path = self.nav_graph.get_shortest_path(robot.current_vertex, destination)
+        if destination == robot.current_vertex:
+            self._complete_in_place(robot)
+            return True
+        start = time.perf_counter()
+        path, edge_times = self._route(robot, destination)
+        self.metrics.observe('assign.latency', time.perf_counter() - start)
         if not path:
+            self.metrics.count('assign.no_path')
             log(f"Robot {robot_id}: No path to vertex {destination}")
             return False
-        robot.assign_task(destination, path)
+        self.traffic_manager.cancel(robot)
+        robot.assign_task(destination, path, edge_times)
+        self.store.mark_changed(robot)
+        if self.recorder is not None:
+            self._record_assign(robot, path, edge_times)
         log(f"Robot {robot_id} assigned task to {destination} with path {path}")
         return True
 
-    def update(self):
-        for robot in self.robots.values():
-            robot.update(self.traffic_manager)
+    def _complete_in_place(self, robot: Robot):
+        # Already there: the task is done without moving (a robot part-way along a lane drops it, as on any reassignment)
+        destination = robot.current_vertex
+        self.traffic_manager.cancel(robot)
+        if self.planner is not None:
+            self.planner.park(robot.id, destination, self.sim_time)
+        self._replan_at.pop(robot.id, None)
+        self._waiting_since.pop(robot.id, None)
+        robot.assign_task(destination, [destination], [])
+        robot.status = RobotStatus.TASK_COMPLETE
+        self.store.mark_changed(robot)
+        self.tasks_completed += 1
+        if self.recorder is not None:
+            self._record_assign(robot, [destination], [])
+            self.recorder.emit(EventKind.COMPLETE, robot.id, destination)
+        log(f"Robot {robot.id} completed task at vertex {destination}")
+
+    def remove_robot(self, robot_id: int):
+        """Take a robot out of the fleet, releasing its lanes, reservations and queued requests."""
+        robot = self.robots[robot_id]
+        self.traffic_manager.cancel(robot)
+        if self.planner is not None:
+            self.planner.release(robot_id)
+        self._replan_at.pop(robot_id, None)
+        self._waiting_since.pop(robot_id, None)
+        # The index may lag behind, but it holds the robot (if at all) under the level recorded here
+        self._robot_index[self._indexed_levels.pop(robot_id)].remove(robot_id)
+        if self.recorder is not None:
+            self.recorder.emit(EventKind.REMOVE, robot_id, robot.current_vertex)
+        log(f"Robot {robot_id} removed at vertex {robot.current_vertex}")
+        self.store.remove(robot)
+
+    def idle_robots(self) -> List[Robot]:
+        return [r for r in self.robots.values() if r.status in (RobotStatus.IDLE, RobotStatus.TASK_COMPLETE)]
+
+    def travel_costs(self, robots: List[Robot], destinations: List[int]) -> List[List[float]]:
+        """Free-flow travel time from each robot (rows) to each destination (columns); inf if unreachable."""
+        # One search covers a whole row or column, so search from whichever side is smaller
+        if len(destinations) <= len(robots):
+            columns = [self.nav_graph.get_times_to(d) for d in destinations]
+            return [[column.get(r.current_vertex, math.inf) for column in columns] for r in robots]
+        rows = [self.nav_graph.get_times_from(r.current_vertex) for r in robots]
+        return [[row.get(d, math.inf) for d in destinations] for row in rows]
+
+    def dispatch_tasks(self, destinations: List[int]) -> Dict[int, int]:
+        """Queue destinations and hand them to idle robots at the lowest total travel time.
+
+        Returns robot id -> destination for the tasks assigned now. The rest stay
+        in task_queue and are dispatched as robots complete their tasks.
+        """
+        for destination in destinations:
+            if not self.nav_graph.has_vertex(destination):
+                raise ValueError(f"Invalid vertex {destination}")
+        self.task_queue.extend(destinations)
+        log(f"Queued {len(destinations)} task(s), {len(self.task_queue)} waiting")
+        with self.metrics.timed('dispatch.latency'):
+            return self._dispatch_queue()
+
+    def _dispatch_queue(self) -> Dict[int, int]:
+        robots = self.idle_robots()
+        if not robots or not self.task_queue:
+            return {}
+        # Queue positions and cost columns of the oldest orders some idle robot can reach; orders no idle robot
+        # can reach stay queued but are skipped, so they do not hold up the orders behind them
+        size = len(robots) * DISPATCH_LOOKAHEAD
+        positions: List[int] = []
+        window: List[int] = []
+        columns: List[List[float]] = []
+        scanned = 0
+        while len(positions) < size and scanned < len(self.task_queue):
+            chunk = list(islice(self.task_queue, scanned, scanned + size - len(positions)))
+            chunk_costs = self.travel_costs(robots, chunk)
+            for j in range(len(chunk)):
+                column = [row[j] for row in chunk_costs]
+                if any(cost < math.inf for cost in column):
+                    positions.append(scanned + j)
+                    window.append(chunk[j])
+                    columns.append(column)
+            scanned += len(chunk)
+        if not positions:
+            return {}
+        costs = [list(row) for row in zip(*columns)]
+        solve = hungarian if len(robots) * len(positions) <= self.optimal_assignment_limit else greedy_assignment
+        assigned: Dict[int, int] = {}
+        served = set()
+        for i, j in solve(costs):
+            robot, destination = robots[i], window[j]
+            if not self.assign_task(robot.id, destination):
+                continue
+            assigned[robot.id] = destination
+            served.add(positions[j])
+        if served:
+            self.task_queue = deque(d for k, d in enumerate(self.task_queue) if k not in served)
+        return assigned
+
+    def _route(self, robot: Robot, destination: int) -> Tuple[List[int], List[float]]:
+        # Planner state only changes once a new route exists; a refused task leaves the old plan in place
+        if self.planner is not None:
+            start = time.perf_counter()
+            plan = self.planner.plan(robot.id, robot.current_vertex, destination, self.sim_time, robot.max_speed)
+            self.metrics.observe('plan.cooperative', time.perf_counter() - start)
+            if plan is not None:
+                self._replan_at.pop(robot.id, None)
+                if plan.replan_time is not None:
+                    self._replan_at[robot.id] = plan.replan_time
+                return plan.path, plan.edge_times
+        path = self.nav_graph.get_shortest_path(robot.current_vertex, destination)
+        if path and self.planner is not None:
+            # No conflict-free plan within the search budget: drive the free-flow route reactively, parked on
+            # the start meanwhile so others plan around it
+            self._replan_at.pop(robot.id, None)
+            self.planner.park(robot.id, robot.current_vertex, self.sim_time)
+            self.metrics.count('plan.fallbacks')
+            log(f"Robot {robot.id}: no cooperative plan to {destination}, routing reactively")
+        return path, [self.nav_graph.get_traversal_time(u, v, robot.max_speed) for u, v in zip(path, path[1:])]
+
+    def _repair_plans(self):
+        """Replan robots whose reserved window is running out, that waited too long, or that are deadlocked."""
+        due = {robot_id for robot_id, time in self._replan_at.items() if time <= self.sim_time}
+        pending = self.traffic_manager.pending
+        for robot_id in list(self._waiting_since):
+            if robot_id not in pending:
+                del self._waiting_since[robot_id]
+        for robot_id in pending:
+            since = self._waiting_since.setdefault(robot_id, self.sim_time)
+            if self.sim_time - since >= REPLAN_AFTER_WAIT:
+                due.add(robot_id)
+        for cycle in self.traffic_manager.find_deadlocks():
+            log(f"Deadlock between robots {cycle}, replanning")
+            due.update(cycle)
+        for robot_id in due:
+            robot = self.robots[robot_id]
+            if not robot.path:
+                # Reached its goal without a plan that ends there (e.g. after a fallback): hold the vertex
+                self._replan_at.pop(robot_id, None)
+                self.planner.park(robot_id, robot.current_vertex, self.sim_time)
+                continue
+            # Only robots standing on a vertex can change route; the rest are retried next tick
+            if robot.progress > 0.0:
+                continue
+            path, edge_times = self._route(robot, robot.destination_vertex)
+            if path:
+                self.traffic_manager.cancel(robot)
+                self._waiting_since.pop(robot_id, None)
+                robot.assign_task(robot.destination_vertex, path, edge_times)
+                self.store.mark_changed(robot)
+                if self.recorder is not None:
+                    self._record_assign(robot, path, edge_times)
+
+    def update(self, dt: float = TICK_SECONDS):
+        metrics, perf = self.metrics, time.perf_counter
+        start = perf()
+        if self.recorder is not None:
+            self._record_tick(dt)
+        self.tick += 1
+        self.sim_time += dt
+        moved = perf()
+        completed = self.store.step(self.traffic_manager, dt)
+        self.tasks_completed += completed
+        phase = perf()
+        metrics.observe('tick.move', phase - moved)
+        if completed and self.task_queue:
+            self._dispatch_queue()
+            dispatched = perf()
+            metrics.observe('tick.dispatch', dispatched - phase)
+            phase = dispatched
+        if self.planner is not None:
+            self._repair_plans()
+            metrics.observe('tick.replan', perf() - phase)
+        metrics.observe('tick.total', perf() - start)
+        waiting = len(self.traffic_manager.pending)
+        metrics.counters['traffic.waiting_robot_ticks'] += waiting
+        metrics.gauges['traffic.waiting'] = waiting
+
+    def stats(self) -> Dict[str, Dict]:
+        """Counters, gauges and timing summaries for the fleet, traffic and routing (see Metrics.snapshot)."""
+        self.metrics.gauge('fleet.robots', len(self.robots))
+        self.metrics.gauge('fleet.task_queue', len(self.task_queue))
+        self.metrics.gauge('fleet.tasks_completed', self.tasks_completed)
+        return merge_snapshots(self.metrics.snapshot(), self.nav_graph.metrics.snapshot())
+
+    def stats_report(self) -> List[str]:
+        return format_report(self.stats())
+
+    def reset_stats(self):
+        self.metrics.reset()
+        self.nav_graph.metrics.reset()
+
+    def start_recording(self, path: str, snapshot_interval: int = RECORD_SNAPSHOT_TICKS):
+        """Write fleet and traffic events to a binary event log at path, starting with a full snapshot.
+
+        FleetReplay rebuilds the state at any tick from the log without simulating.
+        """
+        self.stop_recording()
+        self.recorder = EventLogWriter(path, snapshot_interval)
+        self.recorder.tick = self.tick
+        self.traffic_manager.recorder = self.recorder
+        self._record_snapshot()
+        log(f"Recording events to {path}")
+
+    def stop_recording(self):
+        """Finish the event log with a snapshot of the current tick and close it."""
+        if self.recorder is None:
+            return
+        self._record_snapshot()
+        self.recorder.close()
+        log(f"Recorded {self.recorder.events_written} events to {self.recorder.path}")
+        self.recorder = None
+        self.traffic_manager.recorder = None
+
+    def _record_snapshot(self):
+        self.recorder.write_snapshot(self.sim_time, self.tasks_completed, [
+            (r.id, r.current_vertex, r.path[0] if r.path else -1,
+             -1 if r.destination_vertex is None else r.destination_vertex,
+             STATUS_CODES[r.status], r.progress, r.edge_times[0] if r.edge_times else 0.0)
+            for r in self.robots.values()])
+
+    def _record_tick(self, dt: float):
+        # Snapshots go in before the tick starts, so they follow every event of the tick before
+        recorder = self.recorder
+        recorder.tick = self.tick
+        if recorder.snapshot_due():
+            self._record_snapshot()
+        recorder.tick = self.tick + 1
+        if dt != recorder.timestep:
+            recorder.timestep = dt
+            recorder.emit(EventKind.TIMESTEP, value=dt)
+
+    def _record_assign(self, robot: Robot, path: List[int], edge_times: List[float]):
+        self.recorder.emit(EventKind.ASSIGN, robot.id, path[0], robot.destination_vertex, len(path) - 1,
+                           sum(edge_times))
+
+    @property
+    def change_version(self) -> int:
+        return self.store.version
+
+    def _robot_position(self, robot: Robot) -> Tuple[float, float]:
+        return self.store.position(robot)
+
+    def get_changed_robots(self, since: int) -> Tuple[List[int], int]:
+        """Robots whose position or status changed after change version `since`.
+
+        Returns the ids and the current version to pass as `since` next frame.
+        """
+        return self.store.changed_since(since)
+
+    def _sync_robot_index(self):
+        changed, self._index_version = self.store.changed_since(self._index_version)
+        for robot_id in changed:
+            robot = self.robots[robot_id]
+            level = self.nav_graph.get_vertex_level(robot.current_vertex)
+            previous = self._indexed_levels[robot_id]
+            if previous != level:
+                self._robot_index[previous].remove(robot_id)
+                self._indexed_levels[robot_id] = level
+            self._robot_index[level].insert(robot_id, self._robot_position(robot))
+
+    def robots_within(self, pos: Tuple[float, float], radius: float, level: Optional[str] = None) -> List[int]:
+        self._sync_robot_index()
+        names = [level] if level is not None else list(self._robot_index)
+        return [r for name in names for r in self._robot_index[name].within_radius(pos, radius)]
+
+    def nearest_robot(self, pos: Tuple[float, float], level: Optional[str] = None,
+                      max_distance: Optional[float] = None) -> Optional[int]:
+        self._sync_robot_index()
+        best, best_distance = None, math.inf
+        for name in ([level] if level is not None else self._robot_index):
+            robot_id = self._robot_index[name].nearest(pos, max_distance)
+            if robot_id is not None:
+                distance = math.dist(pos, self._robot_position(self.robots[robot_id]))
+                if distance < best_distance:
+                    best, best_distance = robot_id, distance
+        return best
+
+    def get_robot_position(self, robot_id: int) -> Tuple[float, float]:
+        return self._robot_position(self.robots[robot_id])
+
+    def get_robot_level(self, robot_id: int) -> str:
+        return self.nav_graph.get_vertex_level(self.robots[robot_id].current_vertex)
+
+    def get_robot_state(self, robot_id: int) -> RobotState:
+        robot = self.robots[robot_id]
+        return RobotState(robot.id, self._robot_position(robot), self.get_robot_level(robot_id),
+                          robot.current_vertex, robot.status.value, robot.color)
+
+    def snapshot(self, since: int = 0) -> FleetSnapshot:
+        """Immutable copy of robots changed or removed after version `since` (all robots for since=0)."""
+        changed, version = self.get_changed_robots(since)
+        return FleetSnapshot(version, self.tick, self.sim_time,
+                             {robot_id: self.get_robot_state(robot_id) for robot_id in changed},
+                             self.store.removed_since(since))
 
     def get_robot_positions(self) -> Dict[int, tuple]:
-        positions = {}
-        for robot in self.robots.values():
-            if robot.status == RobotStatus.MOVING and robot.path:
-                start_pos = self.nav_graph.get_vertex_position(robot.current_vertex)
-                next_pos = self.nav_graph.get_vertex_position(robot.path[0])
-                x = start_pos[0] + (next_pos[0] - start_pos[0]) * robot.progress
-                y = start_pos[1] + (next_pos[1] - start_pos[1]) * robot.progress
-                positions[robot.id] = (x, y)
-            else:
-                positions[robot.id] = self.nav_graph.get_vertex_position(robot.current_vertex)
-        return positions
+        return self.store.positions()
 
     def get_robot_statuses(self) -> Dict[int, str]:
         return {r.id: r.status.value for r in self.robots.values()}
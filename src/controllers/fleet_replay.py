@@ -0,0 +1,195 @@
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.models.nav_graph import NavGraph
+from src.models.robot import Robot, RobotStatus
+from src.models.robot_store import STATUSES, STATUS_CODES
+from src.controllers.fleet_manager import FleetSnapshot, RobotState
+from src.utils.change_log import ChangeLog
+from src.utils.event_log import Event, EventKind, EventLogReader
+
+MOVING = STATUS_CODES[RobotStatus.MOVING]
+
+class ReplayRobot:
+    __slots__ = ('id', 'vertex', 'next', 'destination', 'status', 'progress', 'edge_time')
+
+    def __init__(self, robot_id: int, vertex: int, next_vertex: int = -1, destination: int = -1,
+                 status: int = STATUS_CODES[RobotStatus.IDLE], progress: float = 0.0, edge_time: float = 0.0):
+        self.id = robot_id
+        self.vertex = vertex
+        self.next = next_vertex
+        self.destination = destination
+        self.status = status
+        self.progress = progress
+        self.edge_time = edge_time
+
+class FleetReplay:
+    """Fleet state rebuilt from an event log (see FleetManager.start_recording), without simulating.
+
+    seek(tick) loads the nearest snapshot at or before tick and re-applies the
+    events after it. Between events a driving robot's lane progress grows by
+    timestep / lane time per tick, the same float additions the simulation
+    made, so replayed positions match the recorded run exactly. Like
+    FleetManager it offers update()/snapshot()/nearest_robot(), so
+    SimulationEngine can play a recording back into FleetGUI; commands are
+    refused.
+    """
+
+    def __init__(self, nav_graph: NavGraph, path: str):
+        self.nav_graph = nav_graph
+        self.reader = EventLogReader(path)
+        self.robots: Dict[int, ReplayRobot] = {}
+        # Robots part-way along a lane; only these change between events
+        self._driving: Dict[int, ReplayRobot] = {}
+        self.changes = ChangeLog()
+        # Before the first snapshot is loaded
+        self.tick = -1
+        self.sim_time = 0.0
+        self.timestep = 0.0
+        self.tasks_completed = 0
+        self._events: Iterator[Event] = iter(())
+        self._next_event: Optional[Event] = None
+        self.seek(self.reader.first_tick)
+
+    def close(self):
+        self.reader.close()
+
+    def __enter__(self) -> "FleetReplay":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def first_tick(self) -> int:
+        return self.reader.first_tick
+
+    @property
+    def last_tick(self) -> int:
+        return self.reader.last_tick
+
+    def seek(self, tick: int):
+        """Move to the state at the end of `tick` (clamped to the recorded range)."""
+        tick = min(max(tick, self.first_tick), self.last_tick)
+        index = self.reader.snapshot_before(tick)
+        # Rolling forward from where we are beats reloading an earlier snapshot
+        if not self.reader.snapshot_ticks[index] <= self.tick <= tick:
+            self._load_snapshot(index)
+        self._roll_forward(tick)
+
+    def update(self, dt: Optional[float] = None):
+        """Advance one recorded tick; dt is ignored, the recorded timestep applies."""
+        self.seek(self.tick + 1)
+
+    def _load_snapshot(self, index: int):
+        snapshot = self.reader.read_snapshot(index)
+        self.tick, self.sim_time = snapshot.tick, snapshot.sim_time
+        self.timestep, self.tasks_completed = snapshot.timestep, snapshot.tasks_completed
+        robots = {r[0]: ReplayRobot(*r) for r in snapshot.robots}
+        # Seeking can jump past spawns and removals; robots missing from this snapshot are gone
+        for robot_id in self.robots:
+            if robot_id not in robots:
+                self.changes.mark_removed(robot_id)
+        self.robots = robots
+        self._driving = {robot.id: robot for robot in self.robots.values() if robot.progress > 0.0}
+        self.changes.clear_changes()
+        for robot_id in self.robots:
+            self.changes.mark_added(robot_id)
+            self.changes.mark_changed(robot_id)
+        self._events = self.reader.events(index)
+        self._next_event = next(self._events, None)
+
+    def _advance(self, tick: int):
+        # Whole ticks without events: only driving robots move
+        while self.tick < tick:
+            self.tick += 1
+            self.sim_time += self.timestep
+            for robot in self._driving.values():
+                robot.progress += self.timestep / robot.edge_time
+                self.changes.mark_changed(robot.id)
+
+    def _roll_forward(self, tick: int):
+        event = self._next_event
+        while event is not None and event.tick <= tick:
+            if event.kind == EventKind.TIMESTEP:
+                # Emitted before anything else in its tick, so it already applies to that tick
+                self._advance(event.tick - 1)
+                self.timestep = event.value
+            else:
+                self._advance(event.tick)
+                self._apply(event)
+            event = next(self._events, None)
+        self._next_event = event
+        self._advance(tick)
+
+    def _apply(self, event: Event):
+        kind, robot_id = event.kind, event.robot
+        if kind == EventKind.SPAWN:
+            self.robots[robot_id] = ReplayRobot(robot_id, event.a)
+            self.changes.mark_added(robot_id)
+        elif kind == EventKind.REMOVE:
+            del self.robots[robot_id]
+            self._driving.pop(robot_id, None)
+            self.changes.mark_removed(robot_id)
+            return
+        else:
+            robot = self.robots[robot_id]
+            if kind == EventKind.ASSIGN:
+                robot.destination, robot.status = event.b, MOVING
+                robot.next, robot.progress = -1, 0.0
+                self._driving.pop(robot_id, None)
+            elif kind == EventKind.WAIT:
+                robot.status = STATUS_CODES[RobotStatus.WAITING]
+            elif kind == EventKind.RESERVE:
+                robot.status = MOVING
+            elif kind == EventKind.DEPART:
+                robot.status, robot.next, robot.edge_time = MOVING, event.b, event.value
+                robot.progress = self.timestep / robot.edge_time
+                self._driving[robot_id] = robot
+            elif kind == EventKind.ARRIVE:
+                robot.vertex, robot.next, robot.progress = event.b, -1, 0.0
+                self._driving.pop(robot_id, None)
+            elif kind == EventKind.COMPLETE:
+                robot.status = STATUS_CODES[RobotStatus.TASK_COMPLETE]
+                self.tasks_completed += 1
+        self.changes.mark_changed(robot_id)
+
+    def get_robot_position(self, robot_id: int) -> Tuple[float, float]:
+        robot = self.robots[robot_id]
+        start = self.nav_graph.get_vertex_position(robot.vertex)
+        if robot.status != MOVING or robot.progress == 0.0:
+            return start
+        end = self.nav_graph.get_vertex_position(robot.next)
+        return (start[0] + (end[0] - start[0]) * robot.progress,
+                start[1] + (end[1] - start[1]) * robot.progress)
+
+    def get_robot_state(self, robot_id: int) -> RobotState:
+        robot = self.robots[robot_id]
+        return RobotState(robot_id, self.get_robot_position(robot_id), self.nav_graph.get_vertex_level(robot.vertex),
+                          robot.vertex, STATUSES[robot.status].value, Robot.generate_color(robot_id))
+
+    def snapshot(self, since: int = 0) -> FleetSnapshot:
+        """Robots changed or removed after version `since`, in the same form FleetManager.snapshot() returns."""
+        changed = self.changes.changed_since(since)
+        return FleetSnapshot(self.changes.version, self.tick, self.sim_time,
+                             {robot_id: self.get_robot_state(robot_id) for robot_id in changed},
+                             self.changes.removed_since(since))
+
+    def nearest_robot(self, pos: Tuple[float, float], level: Optional[str] = None,
+                      max_distance: Optional[float] = None) -> Optional[int]:
+        best, best_distance = None, math.inf if max_distance is None else max_distance
+        for robot_id, robot in self.robots.items():
+            if level is not None and self.nav_graph.get_vertex_level(robot.vertex) != level:
+                continue
+            distance = math.dist(pos, self.get_robot_position(robot_id))
+            if distance <= best_distance:
+                best, best_distance = robot_id, distance
+        return best
+
+    def spawn_robot(self, vertex: int, robot_id: Optional[int] = None) -> int:
+        raise RuntimeError("A replay cannot spawn robots")
+
+    def assign_task(self, robot_id: int, destination: int) -> bool:
+        return False
+
+    def robot_states(self) -> List[RobotState]:
+        return [self.get_robot_state(robot_id) for robot_id in sorted(self.robots)]
@@ -0,0 +1,288 @@
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
+from src.models.nav_graph import NavGraph
+from src.models.robot import Robot, RobotStatus
+from src.controllers.fleet_manager import FleetManager, FleetSnapshot, RobotState, TICK_SECONDS
+from src.utils.change_log import ChangeLog
+from src.utils.logger import log
+
+IN_LIFT = "In Lift"
+IDLE_STATUSES = (RobotStatus.IDLE.value, RobotStatus.TASK_COMPLETE.value)
+
+def partition_levels(levels: List[str], workers: int) -> List[List[str]]:
+    """Split levels into at most `workers` runs of consecutive levels, so lifts between neighbours often stay in one shard."""
+    workers = max(1, min(workers, len(levels)))
+    size, extra = divmod(len(levels), workers)
+    groups, start = [], 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        groups.append(levels[start:end])
+        start = end
+    return groups
+
+def _run_shard(conn, graph_data: Dict, levels: List[str], backend: str, planner: str):
+    """Worker loop: owns the sub-graph for `levels`, its robots and TrafficManager, and serves pipe commands."""
+    fleet_manager = FleetManager(NavGraph.from_data(graph_data).subgraph(levels), backend=backend, planner=planner)
+    # Robot id -> (lift vertex on the next shard, final destination) for robots driving to a lift
+    handoffs: Dict[int, Tuple[int, int]] = {}
+    version = 0
+    while True:
+        command, *args = conn.recv()
+        if command == "step":
+            steps, dt = args
+            for _ in range(steps):
+                fleet_manager.update(dt)
+            exits = []
+            for robot_id, (entry, destination) in list(handoffs.items()):
+                robot = fleet_manager.robots[robot_id]
+                if robot.status == RobotStatus.TASK_COMPLETE:
+                    exits.append((robot_id, robot.current_vertex, entry, destination))
+                    del handoffs[robot_id]
+                    fleet_manager.remove_robot(robot_id)
+                    # Reaching the lift is only a leg of the task
+                    fleet_manager.tasks_completed -= 1
+            snapshot = fleet_manager.snapshot(version)
+            version = snapshot.version
+            conn.send((snapshot.robots, exits, fleet_manager.tasks_completed))
+        elif command == "spawn":
+            robot_id, vertex, max_speed = args
+            try:
+                fleet_manager.spawn_robot(vertex, robot_id, max_speed)
+                conn.send(None)
+            except (ValueError, RuntimeError) as e:
+                conn.send(str(e))
+        elif command == "assign":
+            # (robot id, destination, handoff or None) per task; replies whether each was assigned
+            replies = []
+            for robot_id, destination, handoff in args[0]:
+                assigned = fleet_manager.assign_task(robot_id, destination)
+                if assigned and handoff is not None:
+                    handoffs[robot_id] = handoff
+                else:
+                    handoffs.pop(robot_id, None)
+                replies.append(assigned)
+            conn.send(replies)
+        elif command == "remove":
+            for robot_id in args[0]:
+                handoffs.pop(robot_id, None)
+                fleet_manager.remove_robot(robot_id)
+            conn.send(None)
+        elif command == "nearest":
+            pos, level, max_distance = args
+            robot_id = fleet_manager.nearest_robot(pos, level, max_distance)
+            conn.send(None if robot_id is None else (robot_id, fleet_manager.get_robot_position(robot_id)))
+        elif command == "stop":
+            conn.close()
+            return
+
+class ShardedSimulation:
+    """Runs the fleet in worker processes, one shard per group of levels.
+
+    Each worker owns a sub-graph, the robots on it and their TrafficManager.
+    Robots change shard through lift lanes: the source shard drives the robot
+    to the lift and hands it back, and once the lift time has passed the
+    coordinator spawns it on the destination shard to finish its task. The
+    coordinator merges the workers' robot states and offers FleetManager's
+    update/snapshot/spawn_robot/assign_task/nearest_robot, so it can be
+    driven by SimulationEngine and shown by FleetGUI.
+    """
+
+    def __init__(self, graph_data: Dict, workers: Optional[int] = None, backend: str = "python",
+                 planner: str = "reactive"):
+        self.nav_graph = NavGraph.from_data(graph_data)
+        groups = partition_levels(list(self.nav_graph.levels), workers or multiprocessing.cpu_count())
+        self.shard_of_level = {level: shard for shard, group in enumerate(groups) for level in group}
+        self._conns = []
+        self._processes = []
+        for shard, group in enumerate(groups):
+            conn, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_run_shard, args=(child, graph_data, group, backend, planner),
+                                              name=f"shard-{shard}", daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+        # Robot id -> shard that owns it, None while riding a lift between shards
+        self.robot_shards: Dict[int, Optional[int]] = {}
+        # Robot id -> speed cap it was spawned with, kept for respawning it after a lift
+        self.max_speeds: Dict[int, Optional[float]] = {}
+        # Robot id -> (arrival time, lift vertex left, lift vertex to arrive at, final destination)
+        self._in_lift: Dict[int, Tuple[float, int, int, int]] = {}
+        self.states: Dict[int, RobotState] = {}
+        self.changes = ChangeLog()
+        self._shard_completed = [0] * len(groups)
+        self._lift_completed = 0
+        self.next_robot_id = 0
+        self.handoffs = 0
+        self.tick = 0
+        self.sim_time = 0.0
+        log(f"Sharded simulation: {len(groups)} worker(s) for levels {groups}")
+
+    def close(self):
+        for conn in self._conns:
+            conn.send(("stop",))
+        for process in self._processes:
+            process.join()
+        self._conns.clear()
+        self._processes.clear()
+
+    def __enter__(self) -> "ShardedSimulation":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _call(self, shard: int, *message):
+        conn = self._conns[shard]
+        conn.send(message)
+        return conn.recv()
+
+    def _shard(self, vertex: int) -> int:
+        return self.shard_of_level[self.nav_graph.get_vertex_level(vertex)]
+
+    def _set_state(self, state: RobotState):
+        self.states[state.id] = state
+        self.changes.mark_changed(state.id)
+
+    def _parked_state(self, robot_id: int, vertex: int, status: str) -> RobotState:
+        return RobotState(robot_id, self.nav_graph.get_vertex_position(vertex), self.nav_graph.get_vertex_level(vertex),
+                          vertex, status, Robot.generate_color(robot_id))
+
+    @property
+    def tasks_completed(self) -> int:
+        return sum(self._shard_completed) + self._lift_completed
+
+    def spawn_robot(self, vertex: int, max_speed: Optional[float] = None) -> int:
+        if not self.nav_graph.has_vertex(vertex):
+            raise ValueError(f"Invalid vertex {vertex}")
+        robot_id = self.next_robot_id
+        shard = self._shard(vertex)
+        error = self._call(shard, "spawn", robot_id, vertex, max_speed)
+        if error is not None:
+            raise RuntimeError(error)
+        self.next_robot_id += 1
+        self.robot_shards[robot_id] = shard
+        self.max_speeds[robot_id] = max_speed
+        self._set_state(self._parked_state(robot_id, vertex, RobotStatus.IDLE.value))
+        return robot_id
+
+    def assign_task(self, robot_id: int, destination: int) -> bool:
+        return self.assign_tasks({robot_id: destination}).get(robot_id, False)
+
+    def assign_tasks(self, assignments: Dict[int, int]) -> Dict[int, bool]:
+        """Assign many tasks with one message round per shard; returns robot id -> assigned."""
+        results: Dict[int, bool] = {}
+        legs: Dict[int, List[Tuple[int, int, Optional[Tuple[int, int]]]]] = {}
+        for robot_id, destination in assignments.items():
+            if robot_id not in self.robot_shards or not self.nav_graph.has_vertex(destination):
+                results[robot_id] = False
+                continue
+            shard = self.robot_shards[robot_id]
+            if shard is None:
+                # Riding a lift: the new destination applies once it arrives
+                arrival, exit_vertex, entry, _ = self._in_lift[robot_id]
+                results[robot_id] = bool(self.nav_graph.get_shortest_path(entry, destination))
+                if results[robot_id]:
+                    self._in_lift[robot_id] = (arrival, exit_vertex, entry, destination)
+                continue
+            leg = self._plan_leg(robot_id, shard, self.states[robot_id].vertex, destination)
+            results[robot_id] = leg is not None
+            if leg is not None and leg[0] is not None:
+                legs.setdefault(shard, []).append((robot_id,) + leg)
+        for shard, shard_legs in legs.items():
+            for (robot_id, _, _), assigned in zip(shard_legs, self._call(shard, "assign", shard_legs)):
+                results[robot_id] = assigned
+        return results
+
+    def _plan_leg(self, robot_id: int, shard: int, start: int,
+                  destination: int) -> Optional[Tuple[Optional[int], Optional[Tuple[int, int]]]]:
+        """(target, handoff) for the shard: drive to the destination, or to the lift where the route leaves it.
+
+        A robot already standing at that lift is taken out of the shard here and the target is None.
+        Returns None if there is no route.
+        """
+        if self._shard(destination) == shard:
+            return destination, None
+        path = self.nav_graph.get_shortest_path(start, destination)
+        if not path:
+            log(f"Robot {robot_id}: No path to vertex {destination}")
+            return None
+        for u, v in zip(path, path[1:]):
+            if self._shard(v) != shard:
+                if u == start:
+                    self._call(shard, "remove", [robot_id])
+                    self._enter_lift(robot_id, u, v, destination)
+                    return None, None
+                return u, (v, destination)
+        return destination, None
+
+    def _enter_lift(self, robot_id: int, exit_vertex: int, entry: int, destination: int):
+        self.robot_shards[robot_id] = None
+        arrival = self.sim_time + self.nav_graph.get_traversal_time(exit_vertex, entry, self.max_speeds[robot_id])
+        self._in_lift[robot_id] = (arrival, exit_vertex, entry, destination)
+        self.handoffs += 1
+        self._set_state(self._parked_state(robot_id, exit_vertex, IN_LIFT))
+        log(f"Robot {robot_id} took the lift from vertex {exit_vertex} to {entry}")
+
+    def _land_lift_arrivals(self):
+        for robot_id, (arrival, exit_vertex, entry, destination) in list(self._in_lift.items()):
+            if arrival > self.sim_time:
+                continue
+            shard = self._shard(entry)
+            # A robot standing on the lift stop keeps this one inside; it retries next update
+            if self._call(shard, "spawn", robot_id, entry, self.max_speeds[robot_id]) is not None:
+                continue
+            del self._in_lift[robot_id]
+            self.robot_shards[robot_id] = shard
+            if entry == destination:
+                self._lift_completed += 1
+                self._set_state(self._parked_state(robot_id, entry, RobotStatus.TASK_COMPLETE.value))
+                log(f"Robot {robot_id} completed task at vertex {entry}")
+            else:
+                # Still on its task, so it is not handed out as idle before the shard reports it
+                self._set_state(self._parked_state(robot_id, entry, RobotStatus.MOVING.value))
+                leg = self._plan_leg(robot_id, shard, entry, destination)
+                if leg is not None and leg[0] is not None:
+                    self._call(shard, "assign", [(robot_id,) + leg])
+
+    def update(self, dt: float = TICK_SECONDS, steps: int = 1):
+        """Advance every shard by `steps` ticks in parallel, then move robots between shards."""
+        for conn in self._conns:
+            conn.send(("step", steps, dt))
+        exits = []
+        for shard, conn in enumerate(self._conns):
+            robots, shard_exits, completed = conn.recv()
+            self._shard_completed[shard] = completed
+            for robot_id, state in robots.items():
+                self._set_state(state)
+            exits.extend(shard_exits)
+        self.tick += steps
+        self.sim_time += steps * dt
+        for robot_id, exit_vertex, entry, destination in exits:
+            self._enter_lift(robot_id, exit_vertex, entry, destination)
+        self._land_lift_arrivals()
+
+    def snapshot(self, since: int = 0) -> FleetSnapshot:
+        """Merged robot states changed after version `since`, in FleetManager.snapshot's format.
+
+        Robots only move between shards here, never leave the fleet, so nothing is ever reported removed.
+        """
+        changed = {robot_id: self.states[robot_id] for robot_id in self.changes.changed_since(since)}
+        return FleetSnapshot(self.changes.version, self.tick, self.sim_time, changed, [])
+
+    def idle_robots(self) -> List[int]:
+        return [robot_id for robot_id, state in self.states.items()
+                if state.status in IDLE_STATUSES and self.robot_shards[robot_id] is not None]
+
+    def nearest_robot(self, pos: Tuple[float, float], level: Optional[str] = None,
+                      max_distance: Optional[float] = None) -> Optional[int]:
+        shards = [self.shard_of_level[level]] if level is not None else range(len(self._conns))
+        best, best_distance = None, None
+        for shard in shards:
+            hit = self._call(shard, "nearest", pos, level, max_distance)
+            if hit is not None:
+                robot_id, (x, y) = hit
+                distance = (x - pos[0]) ** 2 + (y - pos[1]) ** 2
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = robot_id, distance
+        return best
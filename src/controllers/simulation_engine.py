@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from src.controllers.fleet_manager import FleetManager, FleetSnapshot, TICK_SECONDS
+from src.utils.logger import log
+from src.utils.metrics import Metrics, format_report, merge_snapshots
+
+class SimulationEngine:
+    """Steps a FleetManager at a fixed timestep, independent of any GUI.
+
+    In real-time mode steps are paced against the wall clock (scaled by
+    `speedup`); otherwise they run back to back. Observers such as the GUI
+    read state through snapshot() and issue commands while holding `lock`.
+    With `stats_every` set, the stats report (the fleet's, plus the metrics
+    observers registered with add_metrics) is logged every that many
+    simulated seconds.
+    """
+
+    def __init__(self, fleet_manager: FleetManager, timestep: float = TICK_SECONDS,
+                 realtime: bool = True, speedup: float = 1.0, max_catchup_steps: int = 10,
+                 stats_every: Optional[float] = None):
+        if timestep <= 0:
+            raise ValueError(f"Invalid timestep {timestep}")
+        self.fleet_manager = fleet_manager
+        self.timestep = timestep
+        self.realtime = realtime
+        self.speedup = speedup
+        self.max_catchup_steps = max_catchup_steps
+        self.stats_every = stats_every
+        self._next_stats = stats_every
+        # Observers' own metrics (GUI frame times, control server requests), merged into stats()
+        self.observer_metrics: List[Metrics] = []
+        self.lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def step(self, steps: int = 1):
+        with self.lock:
+            for _ in range(steps):
+                self.fleet_manager.update(self.timestep)
+            if self.stats_every is not None and self.fleet_manager.sim_time >= self._next_stats:
+                self._next_stats = self.fleet_manager.sim_time + self.stats_every
+                for line in self.stats_report():
+                    log(line)
+
+    def add_metrics(self, metrics: Metrics):
+        self.observer_metrics.append(metrics)
+
+    def stats(self) -> Dict[str, Dict]:
+        """The fleet's stats merged with the registered observers' metrics."""
+        with self.lock:
+            fleet_stats = self.fleet_manager.stats()
+        return merge_snapshots(fleet_stats, *(metrics.snapshot() for metrics in self.observer_metrics))
+
+    def stats_report(self) -> List[str]:
+        return format_report(self.stats())
+
+    def run(self, duration: Optional[float] = None, steps: Optional[int] = None) -> int:
+        """Step until `duration` simulated seconds or `steps` steps have passed, or stop() is called."""
+        if duration is not None:
+            steps = int(round(duration / self.timestep))
+        done = 0
+        wall_step = self.timestep / self.speedup
+        next_deadline = time.perf_counter()
+        while not self._stop_event.is_set() and (steps is None or done < steps):
+            if not self.realtime:
+                self.step()
+                done += 1
+                continue
+            now = time.perf_counter()
+            if now < next_deadline:
+                time.sleep(next_deadline - now)
+                continue
+            # Fall behind by more than max_catchup_steps and the backlog is dropped, not replayed
+            due = min(int((now - next_deadline) / wall_step) + 1, self.max_catchup_steps)
+            if steps is not None:
+                due = min(due, steps - done)
+            self.step(due)
+            done += due
+            next_deadline = max(next_deadline + due * wall_step, now - wall_step)
+        return done
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name="simulation", daemon=True)
+        self._thread.start()
+        log(f"Simulation started (timestep {self.timestep}s, realtime={self.realtime})")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def snapshot(self, since: int = 0) -> FleetSnapshot:
+        with self.lock:
+            return self.fleet_manager.snapshot(since)
@@ -1,40 +1,168 @@
-from typing import Dict, Set, Tuple
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
 from src.models.robot import Robot, RobotStatus
+from src.utils.event_log import EventKind, EventLogWriter
 from src.utils.logger import log
+from src.utils.metrics import Metrics
 
 class TrafficManager:
-    def __init__(self):
-        self.occupied_edges: Dict[Tuple[int, int], Robot] = {}
-        self.occupied_vertices: Set[int] = set()
-        self.waiting_queues: Dict[Tuple[int, int], Set[Robot]] = {}
+    """Reservation table for lanes and vertices.
+
+    A robot driving lane (u, v) holds the lane plus both end vertices until it
+    completes the move. Blocked robots wait in a FIFO queue on the vertex that
+    blocked them and are woken when that vertex is released, so they do not
+    need to poll every tick.
+    """
+
+    def __init__(self, metrics: Optional[Metrics] = None):
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.edge_holders: Dict[Tuple[int, int], Robot] = {}
+        self.vertex_holders: Dict[int, Robot] = {}
+        self.robot_edges: Dict[int, Tuple[int, int]] = {}
+        self.waiting_queues: Dict[int, Deque[Robot]] = {}
+        # Robot id -> (requested edge, vertex it is queued on)
+        self.pending: Dict[int, Tuple[Tuple[int, int], int]] = {}
+        # Set by FleetManager.start_recording
+        self.recorder: Optional[EventLogWriter] = None
+
+    def _blocker(self, robot: Robot, edge: Tuple[int, int]) -> Optional[int]:
+        """Vertex that keeps robot off edge, or None if the edge is free."""
+        u, v = edge
+        holder = self.edge_holders.get(edge)
+        if holder is not None and holder is not robot:
+            return v
+        # Head-on: somebody is driving the same lane the other way
+        holder = self.edge_holders.get((v, u))
+        if holder is not None and holder is not robot:
+            return v
+        for vertex in (v, u):
+            holder = self.vertex_holders.get(vertex)
+            if holder is not None and holder is not robot:
+                return vertex
+        return None
+
+    def _reserve(self, robot: Robot, edge: Tuple[int, int]):
+        self.edge_holders[edge] = robot
+        self.vertex_holders[edge[0]] = robot
+        self.vertex_holders[edge[1]] = robot
+        self.robot_edges[robot.id] = edge
+
+    def _enqueue(self, robot: Robot, edge: Tuple[int, int], vertex: int):
+        self.waiting_queues.setdefault(vertex, deque()).append(robot)
+        self.pending[robot.id] = (edge, vertex)
+        if self.recorder is not None:
+            self.recorder.emit(EventKind.WAIT, robot.id, edge[0], edge[1], vertex)
 
     def request_move(self, robot: Robot, edge: Tuple[int, int]) -> bool:
-        # Check if edge or destination vertex is occupied
-        if (edge in self.occupied_edges or 
-            edge[1] in self.occupied_vertices or 
-            any(r.current_vertex == edge[1] for r in self.occupied_edges.values())):
-            if edge not in self.waiting_queues:
-                self.waiting_queues[edge] = set()
-            self.waiting_queues[edge].add(robot)
+        # Re-requests are cheap: the holder keeps its lane, a queued robot keeps its place
+        if self.robot_edges.get(robot.id) == edge:
+            # A granted request is always followed by driving, so progress 0 means the robot sets off now
+            if self.recorder is not None and robot.progress == 0.0:
+                self.recorder.emit(EventKind.DEPART, robot.id, edge[0], edge[1], value=robot.edge_times[0])
+            return True
+        pending = self.pending.get(robot.id)
+        if pending is not None:
+            if pending[0] == edge:
+                return False
+            self.cancel(robot)
+
+        blocker = self._blocker(robot, edge)
+        if blocker is not None:
+            self.metrics.counters['traffic.conflicts'] += 1
+            self._enqueue(robot, edge, blocker)
             robot.status = RobotStatus.WAITING
             log(f"Robot {robot.id} waiting for edge {edge}")
             return False
-        
-        # Reserve the edge and destination vertex
-        self.occupied_edges[edge] = robot
-        self.occupied_vertices.add(edge[1])
+
+        self._reserve(robot, edge)
+        self.metrics.counters['traffic.grants'] += 1
+        if self.recorder is not None:
+            self.recorder.emit(EventKind.DEPART, robot.id, edge[0], edge[1], value=robot.edge_times[0])
         log(f"Robot {robot.id} moving on edge {edge}")
         return True
 
     def complete_move(self, robot: Robot, edge: Tuple[int, int]):
-        if edge in self.occupied_edges:
-            del self.occupied_edges[edge]
-            self.occupied_vertices.remove(edge[1])
+        if self.recorder is not None:
+            self.recorder.emit(EventKind.ARRIVE, robot.id, edge[0], edge[1])
+            if len(robot.path) == 1:
+                self.recorder.emit(EventKind.COMPLETE, robot.id, edge[1])
+        if self.edge_holders.get(edge) is robot:
+            self._release(robot)
             log(f"Robot {robot.id} completed move on edge {edge}")
-        
-        # Check waiting queue
-        if edge in self.waiting_queues and self.waiting_queues[edge]:
-            next_robot = self.waiting_queues[edge].pop()
-            if self.request_move(next_robot, edge):
-                next_robot.status = RobotStatus.MOVING
-                log(f"Robot {next_robot.id} resumed from queue on edge {edge}")
\ No newline at end of file
+            for vertex in edge:
+                self._wake(vertex)
+
+    def cancel(self, robot: Robot):
+        """Drop robot's queued request and any lane it holds (e.g. before replanning)."""
+        pending = self.pending.pop(robot.id, None)
+        if pending is not None:
+            queue = self.waiting_queues[pending[1]]
+            queue.remove(robot)
+            if not queue:
+                del self.waiting_queues[pending[1]]
+        edge = self.robot_edges.get(robot.id)
+        if edge is not None:
+            self._release(robot)
+            for vertex in edge:
+                self._wake(vertex)
+
+    def _release(self, robot: Robot):
+        edge = self.robot_edges.pop(robot.id)
+        del self.edge_holders[edge]
+        for vertex in edge:
+            if self.vertex_holders.get(vertex) is robot:
+                del self.vertex_holders[vertex]
+
+    def _wake(self, vertex: int):
+        # Grant the vertex to waiting robots in arrival order; a head that is now
+        # blocked elsewhere moves to that vertex's queue
+        queue = self.waiting_queues.get(vertex)
+        while queue:
+            robot = queue[0]
+            edge = self.pending[robot.id][0]
+            blocker = self._blocker(robot, edge)
+            if blocker == vertex:
+                return
+            queue.popleft()
+            del self.pending[robot.id]
+            if blocker is None:
+                self._reserve(robot, edge)
+                robot.status = RobotStatus.MOVING
+                self.metrics.counters['traffic.resumed'] += 1
+                if self.recorder is not None:
+                    self.recorder.emit(EventKind.RESERVE, robot.id, edge[0], edge[1])
+                log(f"Robot {robot.id} resumed from queue on edge {edge}")
+            else:
+                self.metrics.counters['traffic.requeued'] += 1
+                self._enqueue(robot, edge, blocker)
+        if queue is not None and not queue:
+            del self.waiting_queues[vertex]
+
+    def is_waiting(self, robot: Robot) -> bool:
+        return robot.id in self.pending
+
+    def wait_for_graph(self) -> Dict[int, int]:
+        """Waiting robot id -> id of the robot holding the vertex it is queued on."""
+        graph = {}
+        for robot_id, (_, vertex) in self.pending.items():
+            holder = self.vertex_holders.get(vertex)
+            if holder is not None:
+                graph[robot_id] = holder.id
+        return graph
+
+    def find_deadlocks(self) -> List[List[int]]:
+        """Cycles in the wait-for graph; no robot on a cycle can ever be woken."""
+        # Each waiting robot waits on exactly one holder, so following the edges finds every cycle
+        graph = self.wait_for_graph()
+        walked: Dict[int, int] = {}
+        cycles = []
+        for start in graph:
+            chain = []
+            robot_id = start
+            while robot_id in graph and robot_id not in walked:
+                walked[robot_id] = start
+                chain.append(robot_id)
+                robot_id = graph[robot_id]
+            if walked.get(robot_id) == start:
+                cycles.append(chain[chain.index(robot_id):])
+        return cycles
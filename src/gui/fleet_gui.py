@@ -1,17 +1,35 @@
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from src.models.nav_graph import NavGraph
-from src.controllers.fleet_manager import FleetManager
+from src.controllers.fleet_manager import FleetManager, RobotState
+from src.controllers.simulation_engine import SimulationEngine
+from src.utils.logger import get_log_count, get_recent_logs
+from src.utils.metrics import Metrics
 
 class FleetGUI:
-    def __init__(self, master, nav_graph: NavGraph, fleet_manager: FleetManager):
+    def __init__(self, master, nav_graph: NavGraph, fleet_manager: FleetManager,
+                 engine: SimulationEngine, frame_ms: int = 50):
+        # The GUI only observes: the engine advances the simulation on its own thread
         self.master = master
         self.nav_graph = nav_graph
         self.fleet_manager = fleet_manager
+        self.engine = engine
+        self.frame_ms = frame_ms
         self.selected_robot = None
+        self.level = next(iter(nav_graph.levels))
         self.scale = 50
         self.offset_x = 50
         self.offset_y = 50
+        # (graph version, level, width, height) the static map was last drawn for
+        self.drawn_map = None
+        self.change_version = 0
+        self.robot_items = {}
+        self.robot_rows = {}
+        self.log_count = -1
+        # gui.frame and gui.map_draw timings, reported with the engine's stats
+        self.metrics = Metrics()
+        engine.add_metrics(self.metrics)
         self.setup_ui()
 
     def setup_ui(self):
@@ -27,6 +45,12 @@ class FleetGUI:
         control_panel = tk.Frame(self.master, width=300)
         control_panel.grid(row=0, column=1, sticky="nsew")
 
+        self.level_var = tk.StringVar(value=self.level)
+        level_select = ttk.Combobox(control_panel, textvariable=self.level_var,
+                                    values=list(self.nav_graph.levels), state='readonly')
+        level_select.pack(fill=tk.X, pady=5)
+        level_select.bind("<<ComboboxSelected>>", self.on_level_select)
+
         self.robot_tree = ttk.Treeview(control_panel, columns=('status', 'location'), height=10)
         self.robot_tree.heading('#0', text='Robot ID')
         self.robot_tree.heading('status', text='Status')
@@ -40,84 +64,153 @@ class FleetGUI:
         self.robot_tree.bind("<<TreeviewSelect>>", self.on_robot_select)
 
         self.update_gui()
-        self.master.after(50, self.update)
+        self.master.after(self.frame_ms, self.update)
 
     def draw_environment(self):
+        """Redraw the static map (lanes, vertices, labels) for the current level and canvas size."""
         self.canvas.delete("all")
-        positions = [self.nav_graph.get_vertex_position(v) for v in self.nav_graph.nodes]
+        self.robot_items.clear()
+        level_nodes = self.nav_graph.levels[self.level]
+        width, height = self.canvas_size()
+        positions = [self.nav_graph.get_vertex_position(v) for v in level_nodes] or [(0.0, 0.0)]
         min_x, max_x = min(p[0] for p in positions), max(p[0] for p in positions)
         min_y, max_y = min(p[1] for p in positions), max(p[1] for p in positions)
-        width, height = 1000, 600
-        self.scale = min((width - 100) / (max_x - min_x), (height - 100) / (max_y - min_y)) if max_x > min_x else 50
+        # Fit each axis that has an extent; a single vertex or a straight row or column keeps the default where needed
+        scales = [(size - 100) / (high - low) for size, low, high in ((width, min_x, max_x), (height, min_y, max_y))
+                  if high > low]
+        self.scale = min(scales) if scales else 50
         self.offset_x = (width - (max_x - min_x) * self.scale) / 2 - min_x * self.scale
         self.offset_y = (height - (max_y - min_y) * self.scale) / 2 - min_y * self.scale
 
-        # Draw lanes
+        # Draw lanes; one-way lanes get an arrow, two-way lanes are drawn once
         for u, v in self.nav_graph.edges:
+            if self.nav_graph.get_vertex_level(u) != self.level or self.nav_graph.get_vertex_level(v) != self.level:
+                continue
+            two_way = self.nav_graph.has_lane(v, u)
+            if two_way and u > v:
+                continue
             x1, y1 = self.scale_position(self.nav_graph.get_vertex_position(u))
             x2, y2 = self.scale_position(self.nav_graph.get_vertex_position(v))
-            self.canvas.create_line(x1, y1, x2, y2, fill="gray", width=2)
+            self.canvas.create_line(x1, y1, x2, y2, fill="gray", width=2, arrow=tk.NONE if two_way else tk.LAST)
 
         # Draw vertices
-        for v in self.nav_graph.nodes:
+        for v in level_nodes:
             x, y = self.scale_position(self.nav_graph.get_vertex_position(v))
             fill = "orange" if self.nav_graph.get_vertex_attributes(v).get('is_charger', False) else "lightblue"
             self.canvas.create_oval(x-10, y-10, x+10, y+10, fill=fill, tags=f"vertex_{v}")
             name = self.nav_graph.get_vertex_attributes(v).get('name', str(v))
             self.canvas.create_text(x, y+20, text=name)
 
-        # Draw robots
-        positions = self.fleet_manager.get_robot_positions()
-        statuses = self.fleet_manager.get_robot_statuses()
-        colors = self.fleet_manager.get_robot_colors()
-        for robot_id, (x, y) in positions.items():
-            x, y = self.scale_position((x, y))
-            self.canvas.create_oval(x-8, y-8, x+8, y+8, fill=colors[robot_id], tags=f"robot_{robot_id}")
-            self.canvas.create_text(x, y-20, text=f"R{robot_id} ({statuses[robot_id]})")
+        self.drawn_map = (self.nav_graph.version, self.level, width, height)
+
+    def canvas_size(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        # Before the window is mapped Tk reports 1x1
+        return (width, height) if width > 1 and height > 1 else (1000, 600)
+
+    def draw_robot(self, state: RobotState):
+        """Create, move or hide one robot's canvas items."""
+        items = self.robot_items.get(state.id)
+        if state.level != self.level:
+            if items is not None:
+                self.canvas.delete(items[0], items[1])
+                del self.robot_items[state.id]
+            return
+        x, y = self.scale_position(state.position)
+        label = f"R{state.id} ({state.status})"
+        if items is None:
+            oval = self.canvas.create_oval(x-8, y-8, x+8, y+8, fill=state.color, tags=f"robot_{state.id}")
+            text = self.canvas.create_text(x, y-20, text=label)
+            self.robot_items[state.id] = (oval, text, label)
+            return
+        oval, text, drawn_label = items
+        self.canvas.coords(oval, x-8, y-8, x+8, y+8)
+        self.canvas.coords(text, x, y-20)
+        if label != drawn_label:
+            self.canvas.itemconfigure(text, text=label)
+            self.robot_items[state.id] = (oval, text, label)
+
+    def forget_robot(self, robot_id: int):
+        """Drop a removed robot's canvas items and list row."""
+        items = self.robot_items.pop(robot_id, None)
+        if items is not None:
+            self.canvas.delete(items[0], items[1])
+        if self.robot_rows.pop(robot_id, None) is not None:
+            self.robot_tree.delete(str(robot_id))
+        if self.selected_robot == robot_id:
+            self.selected_robot = None
+
+    def update_robot_row(self, state: RobotState):
+        location = self.nav_graph.get_vertex_attributes(state.vertex).get('name', str(state.id))
+        values = (state.status, location)
+        if self.robot_rows.get(state.id) == values:
+            return
+        iid = str(state.id)
+        if state.id in self.robot_rows:
+            self.robot_tree.item(iid, values=values)
+        else:
+            self.robot_tree.insert('', 'end', iid=iid, text=f"R{state.id}", values=values)
+        self.robot_rows[state.id] = values
 
     def scale_position(self, pos):
         return pos[0] * self.scale + self.offset_x, pos[1] * self.scale + self.offset_y
 
+    def unscale_position(self, pos):
+        return (pos[0] - self.offset_x) / self.scale, (pos[1] - self.offset_y) / self.scale
+
     def update_gui(self):
-        self.draw_environment()
-        self.robot_tree.delete(*self.robot_tree.get_children())
-        for robot_id, status in self.fleet_manager.get_robot_statuses().items():
-            location = self.nav_graph.get_vertex_attributes(self.fleet_manager.robots[robot_id].current_vertex).get('name', str(robot_id))
-            self.robot_tree.insert('', 'end', text=f"R{robot_id}", values=(status, location))
-        try:
-            with open('logs/fleet_logs.txt', 'r') as f:
-                self.log_text.config(state='normal')
-                self.log_text.delete(1.0, tk.END)
-                self.log_text.insert(tk.END, ''.join(f.readlines()[-20:]))
-                self.log_text.config(state='disabled')
-        except FileNotFoundError:
-            pass
+        start = time.perf_counter()
+        width, height = self.canvas_size()
+        if self.drawn_map != (self.nav_graph.version, self.level, width, height):
+            self.draw_environment()
+            self.change_version = 0
+            self.metrics.observe('gui.map_draw', time.perf_counter() - start)
+        snapshot = self.engine.snapshot(self.change_version)
+        self.change_version = snapshot.version
+        for robot_id in snapshot.removed:
+            self.forget_robot(robot_id)
+        for state in snapshot.robots.values():
+            self.draw_robot(state)
+            self.update_robot_row(state)
+        log_count = get_log_count()
+        if log_count != self.log_count:
+            self.log_count = log_count
+            self.log_text.config(state='normal')
+            self.log_text.delete(1.0, tk.END)
+            self.log_text.insert(tk.END, '\n'.join(get_recent_logs(20)))
+            self.log_text.config(state='disabled')
+        self.metrics.observe('gui.frame', time.perf_counter() - start)
 
     def on_canvas_click(self, event):
-        clicked_vertex = None
-        for v in self.nav_graph.nodes:
-            x, y = self.scale_position(self.nav_graph.get_vertex_position(v))
-            if ((event.x - x)**2 + (event.y - y)**2)**0.5 < 10:
-                clicked_vertex = v
-                break
-
+        click_pos = self.unscale_position((event.x, event.y))
+        hit_radius = 10 / self.scale
+        clicked_vertex = self.nav_graph.nearest_vertex(click_pos, self.level, hit_radius)
+
+        error = None
+        with self.engine.lock:
+            if clicked_vertex is not None:
+                if self.selected_robot is None:
+                    try:
+                        self.fleet_manager.spawn_robot(clicked_vertex)
+                    except RuntimeError as e:
+                        error = str(e)
+                else:
+                    if not self.fleet_manager.assign_task(self.selected_robot, clicked_vertex):
+                        error = "No path to destination or path blocked"
+                    self.selected_robot = None
+            clicked_robot = self.fleet_manager.nearest_robot(click_pos, self.level, hit_radius)
+
+        # Show errors only after releasing the lock so the simulation keeps running
+        if error is not None:
+            messagebox.showerror("Error", error)
         if clicked_vertex is not None:
-            if self.selected_robot is None:
-                try:
-                    self.fleet_manager.spawn_robot(clicked_vertex)
-                except RuntimeError as e:
-                    messagebox.showerror("Error", str(e))
-            else:
-                if not self.fleet_manager.assign_task(self.selected_robot, clicked_vertex):
-                    messagebox.showerror("Error", "No path to destination or path blocked")
-                self.selected_robot = None
             self.update_gui()
+        if clicked_robot is not None:
+            self.selected_robot = clicked_robot
 
-        for robot_id, (x, y) in self.fleet_manager.get_robot_positions().items():
-            x, y = self.scale_position((x, y))
-            if ((event.x - x)**2 + (event.y - y)**2)**0.5 < 10:
-                self.selected_robot = robot_id
-                break
+    def on_level_select(self, event):
+        self.level = self.level_var.get()
+        self.update_gui()
 
     def on_robot_select(self, event):
         selected = self.robot_tree.selection()
@@ -126,6 +219,5 @@ class FleetGUI:
             self.update_gui()
 
     def update(self):
-        self.fleet_manager.update()
         self.update_gui()
-        self.master.after(50, self.update)
\ No newline at end of file
+        self.master.after(self.frame_ms, self.update)
\ No newline at end of file
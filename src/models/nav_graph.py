@@ -1,64 +1,556 @@
+import heapq
 import json
-import networkx as nx
-from typing import List, Dict, Tuple
+import math
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional, Set, Tuple
+from src.models import nav_graph_cache
 from src.utils.logger import log
+from src.utils.metrics import Metrics
+from src.utils.spatial_index import SpatialGrid
+
+# Travel speed used for lanes without a positive speed_limit
+DEFAULT_SPEED = 1.0
+# Seconds spent riding a lift between two levels
+LIFT_TRAVERSAL_TIME = 10.0
+DEFAULT_LEVEL = "level1"
+# Lower bound on lane cost so that next-hop walks always make progress
+MIN_LANE_COST = 1e-9
 
 class NavGraph:
-    def __init__(self, json_path: str):
-        self.graph = nx.Graph()
-        self.load_from_json(json_path)
+    def __init__(self, json_path: Optional[str] = None, path_cache_size: int = 4096,
+                 tree_cache_size: int = 64, next_hop_limit: int = 256, use_cache: bool = True):
+        # Vertex attributes (including 'pos' and 'level') and lane attributes, in insertion order
+        self._nodes: Dict[int, Dict] = {}
+        self._succ: Dict[int, Dict[int, Dict]] = {}
+        self.levels: Dict[str, List[int]] = {}
+        self._vertex_index: Dict[str, SpatialGrid] = {}
+        self.path_cache_size = path_cache_size
+        self.tree_cache_size = tree_cache_size
+        self.next_hop_limit = next_hop_limit
+        self.version = 0
+        self._path_cache: "OrderedDict[Tuple[int, int], Tuple[int, ...]]" = OrderedDict()
+        self._trees: "OrderedDict[int, array]" = OrderedDict()
+        self._missed_targets: Set[int] = set()
+        self._compiled = False
+        self._nx_graph = None
+        self._nx_version = -1
+        # route.* counters and timings; cache_hits/cache_misses read from here
+        self.metrics = Metrics()
+        if json_path is not None:
+            self.load_from_json(json_path, use_cache)
 
-    def load_from_json(self, json_path: str):
-        try:
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-            if "levels" in data and "level1" in data["levels"]:
-                level_data = data["levels"]["level1"]
-                vertices = level_data.get('vertices', [])
-                lanes = level_data.get('lanes', [])
-            else:
-                vertices = data.get('vertices', [])
-                lanes = data.get('lanes', [])
+    @classmethod
+    def from_data(cls, data: Dict, **kwargs) -> "NavGraph":
+        nav_graph = cls(**kwargs)
+        nav_graph.load_from_data(data)
+        return nav_graph
+
+    def load_from_json(self, json_path: str, use_cache: bool = True):
+        """Load a nav_graph JSON file.
 
-            if not vertices:
-                log("Error: No vertices found in nav_graph")
-                raise ValueError("No vertices in JSON file")
+        With numpy installed, the loaded graph and its compiled routing arrays are
+        saved next to the file (json_path + CACHE_SUFFIX) and reused while the
+        file's SHA-256 is unchanged.
+        """
+        try:
+            with open(json_path, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            log(f"Error loading nav_graph: {str(e)}")
+            raise
+        use_cache = use_cache and nav_graph_cache.available()
+        if use_cache:
+            digest = nav_graph_cache.source_hash(raw)
+            path = nav_graph_cache.cache_path(json_path)
+            arrays = nav_graph_cache.read(path, digest)
+            if arrays is not None:
+                try:
+                    self._load_cache_arrays(arrays)
+                except Exception as e:
+                    log(f"Warning: Ignoring inconsistent nav_graph cache {path}: {e}")
+                    self._clear()
+                else:
+                    log(f"Loaded graph with {len(self._nodes)} vertices and {self._lane_count()} lanes "
+                        f"on {len(self.levels)} level(s) from {path}")
+                    return
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            log(f"Error loading nav_graph: {json_path} is not valid JSON: {str(e)}")
+            raise
+        self.load_from_data(data)
+        if use_cache:
+            nav_graph_cache.write(path, digest, self._cache_arrays())
 
+    def load_from_data(self, data: Dict):
+        """Build the graph from parsed nav_graph JSON; malformed vertices and lanes are skipped with a warning."""
+        if not isinstance(data, dict):
+            raise ValueError("nav_graph data must be a JSON object")
+        levels = data["levels"] if "levels" in data else {DEFAULT_LEVEL: data}
+        if not isinstance(levels, dict):
+            raise ValueError("nav_graph 'levels' must be a JSON object")
+        # Vertex ids are global: each level's local indices are offset by the vertices before it
+        offset = 0
+        lifts: Dict[str, List[int]] = {}
+        for level_name, level_data in levels.items():
+            if not isinstance(level_data, dict):
+                raise ValueError(f"Level {level_name} must be a JSON object")
+            vertices = level_data.get('vertices', [])
+            lanes = level_data.get('lanes', [])
+            if not isinstance(vertices, list) or not isinstance(lanes, list):
+                raise ValueError(f"Level {level_name}: 'vertices' and 'lanes' must be lists")
+            level_ids = []
             for idx, vertex in enumerate(vertices):
-                if len(vertex) >= 2:
-                    x, y = vertex[0], vertex[1]
-                    attrs = vertex[2] if len(vertex) > 2 else {}
-                    self.graph.add_node(idx, pos=(x, y), **attrs)
+                if self._valid_vertex(vertex):
+                    attrs = dict(vertex[2]) if len(vertex) > 2 else {}
+                    attrs['pos'] = (vertex[0], vertex[1])
+                    attrs['level'] = level_name
+                    self._nodes[offset + idx] = attrs
+                    self._succ[offset + idx] = {}
+                    level_ids.append(offset + idx)
+                    if attrs.get('lift'):
+                        lifts.setdefault(attrs['lift'], []).append(offset + idx)
                 else:
-                    log(f"Warning: Invalid vertex format at index {idx}")
+                    log(f"Warning: Invalid vertex format at index {idx} on {level_name}")
 
             for lane in lanes:
-                if len(lane) >= 2:
-                    self.graph.add_edge(lane[0], lane[1])
+                if self._valid_lane(lane, offset, len(vertices)):
+                    attrs = lane[2] if len(lane) > 2 else {}
+                    self._succ[offset + lane[0]].setdefault(offset + lane[1], {}).update(attrs)
                 else:
                     log(f"Warning: Invalid lane format: {lane}")
 
-            log(f"Loaded graph with {len(self.graph.nodes)} vertices and {len(self.graph.edges)} edges")
-        except Exception as e:
-            log(f"Error loading nav_graph: {str(e)}")
-            raise
+            self.levels[level_name] = level_ids
+            offset += len(vertices)
+
+        if not self._nodes:
+            log("Error: No vertices found in nav_graph")
+            raise ValueError("No vertices in JSON file")
+
+        # Vertices sharing a lift name are joined across levels in both directions
+        for lift_name, stops in lifts.items():
+            for u in stops:
+                for v in stops:
+                    if self._nodes[u]['level'] != self._nodes[v]['level']:
+                        self._succ[u].setdefault(v, {})['lift'] = lift_name
+
+        self._vertex_index = {}
+        self.invalidate()
+        log(f"Loaded graph with {len(self._nodes)} vertices and {self._lane_count()} lanes "
+            f"on {len(self.levels)} level(s)")
+
+    @staticmethod
+    def _is_number(value: Any) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+    @classmethod
+    def _valid_vertex(cls, vertex: Any) -> bool:
+        return (isinstance(vertex, (list, tuple)) and len(vertex) >= 2 and cls._is_number(vertex[0])
+                and cls._is_number(vertex[1]) and (len(vertex) < 3 or isinstance(vertex[2], dict)))
+
+    def _valid_lane(self, lane: Any, offset: int, count: int) -> bool:
+        if not isinstance(lane, (list, tuple)) or len(lane) < 2 or (len(lane) > 2 and not isinstance(lane[2], dict)):
+            return False
+        return all(type(end) is int and 0 <= end < count and offset + end in self._nodes for end in lane[:2])
+
+    def _cache_arrays(self) -> Dict:
+        """The graph and its compiled routing arrays as numpy arrays, for nav_graph_cache."""
+        np = nav_graph_cache.np
+        self._ensure_compiled()
+        level_names = list(self.levels)
+        level_of = {name: i for i, name in enumerate(level_names)}
+        ids = self._ids
+        lanes = [(u, v, attrs) for u, out in self._succ.items() for v, attrs in out.items()]
+        arrays = {
+            'level_names': np.array(level_names, dtype=str),
+            'vertex_ids': np.array(ids, dtype=np.int64),
+            'vertex_levels': np.array([level_of[self._nodes[v]['level']] for v in ids], dtype=np.int32),
+            'xs': np.array(self._xs, dtype=np.float64),
+            'ys': np.array(self._ys, dtype=np.float64),
+            'lane_sources': np.array([u for u, _, _ in lanes], dtype=np.int64),
+            'lane_targets': np.array([v for _, v, _ in lanes], dtype=np.int64),
+            'inv_max_speed': np.array(self._inv_max_speed),
+        }
+        for name in ('offsets', 'targets', 'weights', 'in_offsets', 'in_sources', 'in_weights'):
+            arrays[name] = np.array(getattr(self, '_' + name))
+        arrays.update(nav_graph_cache.encode_attributes(
+            'vertex_attr', [{k: a for k, a in self._nodes[v].items() if k not in ('pos', 'level')} for v in ids]))
+        arrays.update(nav_graph_cache.encode_attributes('lane_attr', [attrs for _, _, attrs in lanes]))
+        return arrays
+
+    @staticmethod
+    def _check_cache_arrays(arrays: Dict):
+        """Raise ValueError unless the cached arrays fit each other (lengths, offsets and index ranges)."""
+        np = nav_graph_cache.np
+        n, lanes = len(arrays['vertex_ids']), len(arrays['lane_sources'])
+        for name, expected in (('vertex_levels', n), ('xs', n), ('ys', n), ('lane_targets', lanes),
+                               ('offsets', n + 1), ('in_offsets', n + 1)):
+            if len(arrays[name]) != expected:
+                raise ValueError(f"{name} has {len(arrays[name])} entries, expected {expected}")
+        for offsets, slots, weights in (('offsets', 'targets', 'weights'), ('in_offsets', 'in_sources', 'in_weights')):
+            bounds = arrays[offsets]
+            if bounds[0] != 0 or (np.diff(bounds) < 0).any() or not bounds[-1] == len(arrays[slots]) == len(arrays[weights]):
+                raise ValueError(f"{offsets} does not match {slots} and {weights}")
+            if ((arrays[slots] < 0) | (arrays[slots] >= n)).any():
+                raise ValueError(f"{slots} refers to a vertex slot out of range")
+        if ((arrays['vertex_levels'] < 0) | (arrays['vertex_levels'] >= len(arrays['level_names']))).any():
+            raise ValueError("vertex_levels refers to an unknown level")
+        if not np.isin(arrays['lane_sources'], arrays['vertex_ids']).all() \
+                or not np.isin(arrays['lane_targets'], arrays['vertex_ids']).all():
+            raise ValueError("a lane refers to an unknown vertex")
+
+    def _load_cache_arrays(self, arrays: Dict):
+        self._check_cache_arrays(arrays)
+        level_names = arrays['level_names'].tolist()
+        ids = arrays['vertex_ids'].tolist()
+        self.levels = {name: [] for name in level_names}
+        self._nodes, self._succ = {}, {}
+        vertex_attrs = nav_graph_cache.decode_attributes('vertex_attr', arrays, len(ids))
+        for v, level, x, y, attrs in zip(ids, arrays['vertex_levels'].tolist(), arrays['xs'].tolist(),
+                                         arrays['ys'].tolist(), vertex_attrs):
+            attrs['pos'] = (x, y)
+            attrs['level'] = level_names[level]
+            self._nodes[v] = attrs
+            self._succ[v] = {}
+            self.levels[level_names[level]].append(v)
+        sources, targets = arrays['lane_sources'].tolist(), arrays['lane_targets'].tolist()
+        for u, v, attrs in zip(sources, targets, nav_graph_cache.decode_attributes('lane_attr', arrays, len(sources))):
+            self._succ[u][v] = attrs
+        self._vertex_index = {}
+        self.invalidate()
+
+        to_array = nav_graph_cache.to_array
+        self._ids = ids
+        self._xs, self._ys = to_array('d', arrays['xs']), to_array('d', arrays['ys'])
+        self._offsets, self._targets = to_array('l', arrays['offsets']), to_array('l', arrays['targets'])
+        self._weights = to_array('d', arrays['weights'])
+        self._in_offsets, self._in_sources = to_array('l', arrays['in_offsets']), to_array('l', arrays['in_sources'])
+        self._in_weights = to_array('d', arrays['in_weights'])
+        self._inv_max_speed = float(arrays['inv_max_speed'])
+        self._finish_compile()
+
+    def _clear(self):
+        self._nodes, self._succ, self.levels, self._vertex_index = {}, {}, {}, {}
+        self.invalidate()
+
+    def subgraph(self, levels: List[str]) -> "NavGraph":
+        """Copy of the given levels with vertex ids kept; lanes to other levels (e.g. lifts) are dropped."""
+        nav_graph = NavGraph(path_cache_size=self.path_cache_size, tree_cache_size=self.tree_cache_size,
+                             next_hop_limit=self.next_hop_limit)
+        kept = {v for level in levels for v in self.levels[level]}
+        for v in self._nodes:
+            if v in kept:
+                nav_graph._nodes[v] = dict(self._nodes[v])
+                nav_graph._succ[v] = {w: dict(attrs) for w, attrs in self._succ[v].items() if w in kept}
+        nav_graph.levels = {level: list(self.levels[level]) for level in levels}
+        nav_graph._vertex_index = {level: self._vertex_index[level] for level in levels if level in self._vertex_index}
+        nav_graph.invalidate()
+        return nav_graph
+
+    def add_lane(self, u: int, v: int, **attrs):
+        self._succ[u].setdefault(v, {}).update(attrs)
+        self.invalidate()
+
+    def remove_lane(self, u: int, v: int):
+        del self._succ[u][v]
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop the compiled adjacency and every cached route after a graph change."""
+        self._path_cache.clear()
+        self._trees.clear()
+        self._missed_targets.clear()
+        self._compiled = False
+        self.version += 1
+
+    def compile(self):
+        """Pack the graph into CSR arrays indexed by dense vertex slots.
+
+        Forward arrays (offsets/targets/weights) drive single-pair A*; the reversed
+        copy (in_offsets/in_sources/in_weights) drives the per-destination trees.
+        Weights are traversal times (see get_traversal_time).
+        """
+        self._ids = list(self._nodes)
+        slot = {v: i for i, v in enumerate(self._ids)}
+        n = len(self._ids)
+        self._xs = array('d', (self._nodes[v]['pos'][0] for v in self._ids))
+        self._ys = array('d', (self._nodes[v]['pos'][1] for v in self._ids))
+
+        lanes: List[Tuple[int, int, float]] = []
+        max_speed = DEFAULT_SPEED
+        for u, out in self._succ.items():
+            for v, attrs in out.items():
+                max_speed = max(max_speed, self._lane_speed(attrs))
+                lanes.append((slot[u], slot[v], self._lane_time(u, v, attrs)))
+        self._offsets, self._targets, self._weights = self._pack(n, lanes, 0, 1)
+        self._in_offsets, self._in_sources, self._in_weights = self._pack(n, lanes, 1, 0)
+        # Straight-line distance at the fastest lane speed never overestimates the cost
+        self._inv_max_speed = 1.0 / max_speed
+        self._finish_compile()
+
+    def _finish_compile(self):
+        self._slot = {v: i for i, v in enumerate(self._ids)}
+        self._trees.clear()
+        self._compiled = True
+        n = len(self._ids)
+        if 0 < n <= self.next_hop_limit:
+            # Small maps get the full next-hop table up front: one tree per destination
+            for t in range(n):
+                self._trees[t] = self._build_tree(t)
+
+    @property
+    def cache_hits(self) -> int:
+        return self.metrics.counters['route.cache_hits']
+
+    @property
+    def cache_misses(self) -> int:
+        return self.metrics.counters['route.cache_misses']
+
+    @property
+    def graph(self):
+        """networkx DiGraph copy of the map, rebuilt after changes; networkx is only imported here."""
+        if self._nx_graph is None or self._nx_version != self.version:
+            import networkx as nx
+            graph = nx.DiGraph()
+            graph.add_nodes_from(self._nodes.items())
+            graph.add_edges_from((u, v, attrs) for u, out in self._succ.items() for v, attrs in out.items())
+            self._nx_graph, self._nx_version = graph, self.version
+        return self._nx_graph
+
+    def _lane_count(self) -> int:
+        return sum(len(out) for out in self._succ.values())
+
+    @staticmethod
+    def _pack(n: int, lanes: List[Tuple[int, int, float]], key: int, other: int) -> Tuple[array, array, array]:
+        counts = [0] * (n + 1)
+        for lane in lanes:
+            counts[lane[key] + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        offsets = array('l', counts)
+        fill = counts[:-1]
+        targets = array('l', [0]) * len(lanes)
+        weights = array('d', [0.0]) * len(lanes)
+        for lane in lanes:
+            k = fill[lane[key]]
+            fill[lane[key]] += 1
+            targets[k] = lane[other]
+            weights[k] = lane[2]
+        return offsets, targets, weights
+
+    @staticmethod
+    def _lane_speed(attrs: Dict) -> float:
+        speed = attrs.get('speed_limit') or 0
+        return speed if speed > 0 else DEFAULT_SPEED
+
+    def _lane_time(self, u: int, v: int, attrs: Dict, max_speed: Optional[float] = None) -> float:
+        if attrs.get('lift'):
+            return LIFT_TRAVERSAL_TIME + self.get_lane_length(u, v) / DEFAULT_SPEED
+        speed = self._lane_speed(attrs)
+        if max_speed:
+            speed = min(speed, max_speed)
+        return max(self.get_lane_length(u, v) / speed, MIN_LANE_COST)
+
+    def get_lane_length(self, u: int, v: int) -> float:
+        (x1, y1), (x2, y2) = self._nodes[u]['pos'], self._nodes[v]['pos']
+        return math.hypot(x2 - x1, y2 - y1)
+
+    def get_traversal_time(self, u: int, v: int, max_speed: Optional[float] = None) -> float:
+        """Seconds to drive lane u->v at its speed limit, capped by the robot's max_speed."""
+        return self._lane_time(u, v, self._succ[u][v], max_speed)
+
+    def get_lane_attributes(self, u: int, v: int) -> Dict:
+        return dict(self._succ[u][v])
+
+    def _ensure_compiled(self):
+        if not self._compiled:
+            start = time.perf_counter()
+            self.compile()
+            self.metrics.observe('route.compile', time.perf_counter() - start)
+
+    def _build_tree(self, t: int) -> array:
+        return self._dijkstra(t, self._in_offsets, self._in_sources, self._in_weights)[1]
+
+    def _dijkstra(self, t: int, offsets: array, sources: array, weights: array) -> Tuple[List[float], array]:
+        # Over the reversed arrays: dist[u] is the time from u to t and tree[u] the slot after u on the
+        # way to t (-1 if unreachable). Over the forward arrays the same holds with directions swapped.
+        n = len(self._ids)
+        dist = [math.inf] * n
+        tree = array('l', [-1]) * n
+        dist[t] = 0.0
+        tree[t] = t
+        heap = [(0.0, t)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > dist[v]:
+                continue
+            for k in range(offsets[v], offsets[v + 1]):
+                u = sources[k]
+                nd = d + weights[k]
+                if nd < dist[u]:
+                    dist[u] = nd
+                    tree[u] = v
+                    heapq.heappush(heap, (nd, u))
+        return dist, tree
+
+    def _search(self, s: int, t: int) -> List[int]:
+        # A* over the CSR arrays with a Euclidean time heuristic
+        offsets, targets, weights = self._offsets, self._targets, self._weights
+        xs, ys, inv_speed = self._xs, self._ys, self._inv_max_speed
+        tx, ty = xs[t], ys[t]
+        dist = {s: 0.0}
+        prev = {s: -1}
+        heap = [(math.hypot(xs[s] - tx, ys[s] - ty) * inv_speed, 0.0, s)]
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if u == t:
+                path = []
+                while u != -1:
+                    path.append(u)
+                    u = prev[u]
+                path.reverse()
+                return path
+            if d > dist[u]:
+                continue
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                nd = d + weights[k]
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(heap, (nd + math.hypot(xs[v] - tx, ys[v] - ty) * inv_speed, nd, v))
+        return []
+
+    def _tree_for(self, t: int) -> Optional[array]:
+        tree = self._trees.get(t)
+        if tree is not None:
+            self._trees.move_to_end(t)
+            return tree
+        # A destination earns its own tree on the second miss; one-off queries stay on A*
+        if self.tree_cache_size <= 0 or t not in self._missed_targets:
+            self._missed_targets.add(t)
+            return None
+        start = time.perf_counter()
+        tree = self._build_tree(t)
+        self.metrics.observe('route.tree_build', time.perf_counter() - start)
+        self._trees[t] = tree
+        if len(self._trees) > max(self.tree_cache_size, self.next_hop_limit):
+            self._trees.popitem(last=False)
+        return tree
+
+    @staticmethod
+    def _walk_tree(tree: array, s: int, t: int) -> List[int]:
+        if tree[s] == -1:
+            return []
+        path = [s]
+        while s != t:
+            s = tree[s]
+            path.append(s)
+        return path
 
     def get_shortest_path(self, start: int, end: int) -> List[int]:
-        try:
-            return nx.shortest_path(self.graph, start, end)
-        except nx.NetworkXNoPath:
+        key = (start, end)
+        cached = self._path_cache.get(key)
+        if cached is not None:
+            self._path_cache.move_to_end(key)
+            self.metrics.counters['route.cache_hits'] += 1
+            return list(cached)
+        self.metrics.counters['route.cache_misses'] += 1
+        self._ensure_compiled()
+        if start not in self._slot or end not in self._slot:
             return []
+        s, t = self._slot[start], self._slot[end]
+        tree = self._tree_for(t)
+        if tree is not None:
+            slots = self._walk_tree(tree, s, t)
+        else:
+            began = time.perf_counter()
+            slots = self._search(s, t)
+            self.metrics.observe('route.search', time.perf_counter() - began)
+        path = tuple(self._ids[i] for i in slots)
+        if self.path_cache_size > 0:
+            self._path_cache[key] = path
+            if len(self._path_cache) > self.path_cache_size:
+                self._path_cache.popitem(last=False)
+        return list(path)
+
+    def get_times_to(self, end: int) -> Dict[int, float]:
+        """Travel time from every vertex that can reach `end`, in seconds (an exact heuristic for planners)."""
+        self._ensure_compiled()
+        if end not in self._slot:
+            return {}
+        dist = self._dijkstra(self._slot[end], self._in_offsets, self._in_sources, self._in_weights)[0]
+        return {self._ids[i]: d for i, d in enumerate(dist) if d < math.inf}
+
+    def get_times_from(self, start: int) -> Dict[int, float]:
+        """Travel time from `start` to every vertex it can reach, in seconds."""
+        self._ensure_compiled()
+        if start not in self._slot:
+            return {}
+        dist = self._dijkstra(self._slot[start], self._offsets, self._targets, self._weights)[0]
+        return {self._ids[i]: d for i, d in enumerate(dist) if d < math.inf}
+
+    def get_neighbors(self, vertex_id: int) -> List[int]:
+        return list(self._succ[vertex_id])
+
+    def get_path_cost(self, path: List[int]) -> float:
+        self._ensure_compiled()
+        cost = 0.0
+        for u, v in zip(path, path[1:]):
+            i = self._slot[u]
+            j = self._slot[v]
+            for k in range(self._offsets[i], self._offsets[i + 1]):
+                if self._targets[k] == j:
+                    cost += self._weights[k]
+                    break
+            else:
+                raise ValueError(f"No lane between {u} and {v}")
+        return cost
 
     def get_vertex_position(self, vertex_id: int) -> Tuple[float, float]:
-        return self.graph.nodes[vertex_id]['pos']
+        return self._nodes[vertex_id]['pos']
 
     def get_vertex_attributes(self, vertex_id: int) -> Dict:
-        return {k: v for k, v in self.graph.nodes[vertex_id].items() if k != 'pos'}
+        return {k: v for k, v in self._nodes[vertex_id].items() if k != 'pos'}
+
+    def get_vertex_level(self, vertex_id: int) -> str:
+        return self._nodes[vertex_id]['level']
+
+    def has_vertex(self, vertex_id: int) -> bool:
+        return vertex_id in self._nodes
+
+    def has_lane(self, u: int, v: int) -> bool:
+        return v in self._succ.get(u, ())
+
+    def _level_index(self, level: str) -> SpatialGrid:
+        # Built on the first position query for the level, not at load time
+        grid = self._vertex_index.get(level)
+        if grid is None:
+            grid = SpatialGrid.for_points((v, self._nodes[v]['pos']) for v in self.levels[level])
+            self._vertex_index[level] = grid
+        return grid
+
+    def nearest_vertex(self, pos: Tuple[float, float], level: Optional[str] = None,
+                       max_distance: Optional[float] = None) -> Optional[int]:
+        best, best_distance = None, math.inf
+        for name in ([level] if level is not None else self.levels):
+            v = self._level_index(name).nearest(pos, max_distance)
+            if v is not None:
+                distance = math.dist(pos, self._nodes[v]['pos'])
+                if distance < best_distance:
+                    best, best_distance = v, distance
+        return best
+
+    def vertices_within(self, pos: Tuple[float, float], radius: float, level: Optional[str] = None) -> List[int]:
+        names = [level] if level is not None else list(self.levels)
+        return [v for name in names for v in self._level_index(name).within_radius(pos, radius)]
 
     @property
     def nodes(self) -> List[int]:
-        return list(self.graph.nodes)
+        return list(self._nodes)
 
     @property
     def edges(self) -> List[Tuple[int, int]]:
-        return list(self.graph.edges)
\ No newline at end of file
+        return [(u, v) for u, out in self._succ.items() for v in out]
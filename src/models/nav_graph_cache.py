@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+from array import array
+from typing import Dict, List, Optional
+from src.utils.logger import log
+
+try:
+    import numpy as np
+except ImportError:  # without numpy maps are always parsed from JSON
+    np = None
+
+# Bump when the cached arrays change meaning, so old caches are rebuilt
+CACHE_FORMAT = 1
+CACHE_SUFFIX = ".cache.npz"
+
+def available() -> bool:
+    return np is not None
+
+def cache_path(json_path: str) -> str:
+    return json_path + CACHE_SUFFIX
+
+def source_hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+def read(path: str, digest: str) -> Optional[Dict[str, "np.ndarray"]]:
+    """Arrays stored at path, or None if there is no cache or it was built from a different source."""
+    if np is None or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as f:
+            if int(f['format']) != CACHE_FORMAT or str(f['source_hash']) != digest:
+                return None
+            return {name: f[name] for name in f.files}
+    # A truncated or corrupted file can fail in zipfile, zlib or numpy's format parser; any of it is a miss
+    except Exception as e:
+        log(f"Warning: Ignoring unreadable nav_graph cache {path}: {e}")
+        return None
+
+def write(path: str, digest: str, arrays: Dict[str, "np.ndarray"]):
+    """Store arrays at path; written to a temporary file first so readers never see a partial cache."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, format=np.array(CACHE_FORMAT), source_hash=np.array(digest), **arrays)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log(f"Warning: Could not write nav_graph cache {path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def to_array(typecode: str, values: "np.ndarray") -> array:
+    result = array(typecode)
+    result.frombytes(np.ascontiguousarray(values, dtype=np.dtype(typecode)).tobytes())
+    return result
+
+def _column_kind(values: List) -> str:
+    kinds = {type(value) for value in values}
+    if kinds == {bool}:
+        return 'bool'
+    if kinds == {int} and all(-2 ** 63 <= value < 2 ** 63 for value in values):
+        return 'int64'
+    if kinds == {float}:
+        return 'float64'
+    if kinds == {str}:
+        return 'str'
+    # Mixed, null or nested values are kept as JSON text
+    return 'json'
+
+def encode_attributes(prefix: str, rows: List[Dict]) -> Dict[str, "np.ndarray"]:
+    """Column arrays for a list of attribute dicts: per key, the rows that have it and their values."""
+    columns: Dict[str, tuple] = {}
+    for i, attrs in enumerate(rows):
+        for key, value in attrs.items():
+            column = columns.setdefault(key, ([], []))
+            column[0].append(i)
+            column[1].append(value)
+    kinds = [_column_kind(values) for _, values in columns.values()]
+    arrays = {f"{prefix}_keys": np.array(list(columns), dtype=str), f"{prefix}_kinds": np.array(kinds, dtype=str)}
+    for k, ((rows_with_key, values), kind) in enumerate(zip(columns.values(), kinds)):
+        arrays[f"{prefix}{k}_rows"] = np.array(rows_with_key, dtype=np.int64)
+        if kind == 'json':
+            arrays[f"{prefix}{k}_values"] = np.array([json.dumps(value) for value in values], dtype=str)
+        else:
+            arrays[f"{prefix}{k}_values"] = np.array(values, dtype=kind)
+    return arrays
+
+def decode_attributes(prefix: str, arrays: Dict[str, "np.ndarray"], count: int) -> List[Dict]:
+    rows: List[Dict] = [{} for _ in range(count)]
+    keys = arrays[f"{prefix}_keys"].tolist()
+    kinds = arrays[f"{prefix}_kinds"].tolist()
+    for k, (key, kind) in enumerate(zip(keys, kinds)):
+        values = arrays[f"{prefix}{k}_values"].tolist()
+        if kind == 'json':
+            values = [json.loads(value) for value in values]
+        for i, value in zip(arrays[f"{prefix}{k}_rows"].tolist(), values):
+            rows[i][key] = value
+    return rows
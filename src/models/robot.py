@@ -9,42 +9,57 @@ class RobotStatus(Enum):
     TASK_COMPLETE = "Task Complete"
 
 class Robot:
-    def __init__(self, robot_id: int, start_vertex: int):
+    __slots__ = ('id', 'current_vertex', 'destination_vertex', 'path', 'edge_times', 'status', 'color',
+                 'progress', 'max_speed')
+
+    def __init__(self, robot_id: int, start_vertex: int, max_speed: Optional[float] = None):
         self.id = robot_id
         self.current_vertex = start_vertex
         self.destination_vertex: Optional[int] = None
         self.path: List[int] = []
+        # Seconds needed for each lane in path, computed from lane length and speed limit
+        self.edge_times: List[float] = []
         self.status = RobotStatus.IDLE
         self.color = self.generate_color(robot_id)
         self.progress = 0.0
-        self.speed = 0.05
+        self.max_speed = max_speed
 
     @staticmethod
     def generate_color(robot_id: int) -> str:
         colors = ['#FF0000', '#00FF00', '#0000FF', '#FFFF00', '#FF00FF', '#00FFFF']
         return colors[robot_id % len(colors)]
 
-    def assign_task(self, destination: int, path: List[int]):
+    def assign_task(self, destination: int, path: List[int], edge_times: List[float]):
         self.destination_vertex = destination
         self.path = path[1:]
+        self.edge_times = list(edge_times)
         self.status = RobotStatus.MOVING
         self.progress = 0.0
+        self._route_changed()
         log(f"Robot {self.id} assigned task to vertex {destination}")
 
-    def update(self, traffic_manager):
+    def _route_changed(self):
+        """Hook for subclasses that mirror the head of the route elsewhere."""
+
+    def update(self, traffic_manager, dt: float):
         if self.status == RobotStatus.MOVING and self.path:
-            next_vertex = self.path[0]
-            edge = (self.current_vertex, next_vertex)
+            edge = (self.current_vertex, self.path[0])
             if traffic_manager.request_move(self, edge):
-                self.progress += self.speed
+                self.progress += dt / self.edge_times[0]
                 if self.progress >= 1.0:
-                    traffic_manager.complete_move(self, edge)
-                    self.current_vertex = next_vertex
-                    self.path.pop(0)
-                    self.progress = 0.0
-                    if not self.path:
-                        self.status = RobotStatus.TASK_COMPLETE
-                        log(f"Robot {self.id} completed task at vertex {self.current_vertex}")
+                    self.finish_edge(traffic_manager)
             else:
                 self.status = RobotStatus.WAITING
-                log(f"Robot {self.id} waiting at vertex {self.current_vertex}")
\ No newline at end of file
+                log(f"Robot {self.id} waiting at vertex {self.current_vertex}")
+
+    def finish_edge(self, traffic_manager):
+        next_vertex = self.path[0]
+        traffic_manager.complete_move(self, (self.current_vertex, next_vertex))
+        self.current_vertex = next_vertex
+        self.path.pop(0)
+        self.edge_times.pop(0)
+        self.progress = 0.0
+        self._route_changed()
+        if not self.path:
+            self.status = RobotStatus.TASK_COMPLETE
+            log(f"Robot {self.id} completed task at vertex {self.current_vertex}")
@@ -0,0 +1,231 @@
+from typing import Dict, List, Optional, Tuple
+from src.models.robot import Robot, RobotStatus
+from src.utils.change_log import ChangeLog
+from src.utils.logger import log
+
+try:
+    import numpy as np
+except ImportError:  # the array backend is optional
+    np = None
+
+STATUSES = list(RobotStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+MOVING = STATUS_CODES[RobotStatus.MOVING]
+TASK_COMPLETE = STATUS_CODES[RobotStatus.TASK_COMPLETE]
+# Per-slot arrays of ArrayRobotStore: (name, dtype, fill value for empty slots)
+ARRAY_FIELDS = (
+    ('ids', 'int64', -1),
+    ('current', 'int64', -1),
+    ('next', 'int64', -1),
+    ('progress', 'float64', 0.0),
+    ('edge_time', 'float64', 1.0),
+    ('status', 'int8', STATUS_CODES[RobotStatus.IDLE]),
+    ('granted', 'bool', False),
+    ('versions', 'int64', 0),
+)
+
+class RobotStore:
+    """Plain Python backend: one Robot object per robot, stepped one at a time."""
+
+    def __init__(self, nav_graph):
+        self.nav_graph = nav_graph
+        self.robots: Dict[int, Robot] = {}
+        self.changes = ChangeLog()
+
+    @property
+    def version(self) -> int:
+        return self.changes.version
+
+    def add(self, robot_id: int, vertex: int, max_speed: Optional[float] = None) -> Robot:
+        robot = Robot(robot_id, vertex, max_speed)
+        self.robots[robot_id] = robot
+        self.changes.mark_added(robot_id)
+        return robot
+
+    def remove(self, robot: Robot):
+        del self.robots[robot.id]
+        self.changes.mark_removed(robot.id)
+
+    def mark_changed(self, robot: Robot):
+        self.changes.mark_changed(robot.id)
+
+    def changed_since(self, since: int) -> Tuple[List[int], int]:
+        return self.changes.changed_since(since), self.version
+
+    def removed_since(self, since: int) -> List[int]:
+        return self.changes.removed_since(since)
+
+    def step(self, traffic_manager, dt: float) -> int:
+        """Advance every robot by dt; returns how many finished their task this step."""
+        completed = 0
+        for robot in self.robots.values():
+            status = robot.status
+            robot.update(traffic_manager, dt)
+            if status == RobotStatus.MOVING or robot.status != status:
+                self.mark_changed(robot)
+                if robot.status == RobotStatus.TASK_COMPLETE:
+                    completed += 1
+        return completed
+
+    def position(self, robot: Robot) -> Tuple[float, float]:
+        if robot.status == RobotStatus.MOVING and robot.path:
+            start_pos = self.nav_graph.get_vertex_position(robot.current_vertex)
+            next_pos = self.nav_graph.get_vertex_position(robot.path[0])
+            x = start_pos[0] + (next_pos[0] - start_pos[0]) * robot.progress
+            y = start_pos[1] + (next_pos[1] - start_pos[1]) * robot.progress
+            return x, y
+        return self.nav_graph.get_vertex_position(robot.current_vertex)
+
+    def positions(self) -> Dict[int, Tuple[float, float]]:
+        return {robot.id: self.position(robot) for robot in self.robots.values()}
+
+class ArrayRobot(Robot):
+    """Robot whose hot fields live in an ArrayRobotStore; routes stay as Python lists."""
+    __slots__ = ('_store', '_slot')
+
+    def __init__(self, store: "ArrayRobotStore", slot: int, robot_id: int, start_vertex: int,
+                 max_speed: Optional[float] = None):
+        self._store = store
+        self._slot = slot
+        super().__init__(robot_id, start_vertex, max_speed)
+
+    @property
+    def current_vertex(self) -> int:
+        return int(self._store.current[self._slot])
+
+    @current_vertex.setter
+    def current_vertex(self, vertex: int):
+        self._store.current[self._slot] = vertex
+
+    @property
+    def progress(self) -> float:
+        return float(self._store.progress[self._slot])
+
+    @progress.setter
+    def progress(self, progress: float):
+        self._store.progress[self._slot] = progress
+
+    @property
+    def status(self) -> RobotStatus:
+        return STATUSES[self._store.status[self._slot]]
+
+    @status.setter
+    def status(self, status: RobotStatus):
+        self._store.status[self._slot] = STATUS_CODES[status]
+
+    def _route_changed(self):
+        store, slot = self._store, self._slot
+        store.next[slot] = self.path[0] if self.path else -1
+        store.edge_time[slot] = self.edge_times[0] if self.path else 1.0
+        store.granted[slot] = False
+
+class ArrayRobotStore(RobotStore):
+    """Structure-of-arrays backend.
+
+    Current/next vertex, progress, current lane time, status code,
+    lane grant and change version are NumPy arrays indexed by slot, and vertex
+    coordinates are one contiguous array. A step advances every driving robot
+    with a few array operations; Python code only runs for robots that start
+    or finish a lane.
+    """
+
+    def __init__(self, nav_graph, capacity: int = 1024):
+        if np is None:
+            raise ImportError("The array robot backend requires numpy")
+        super().__init__(nav_graph)
+        nodes = nav_graph.nodes
+        self.coords = np.full((max(nodes) + 1, 2), np.nan)
+        for v in nodes:
+            self.coords[v] = nav_graph.get_vertex_position(v)
+        self.size = 0
+        self._by_slot: List[ArrayRobot] = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        for name, dtype, fill in ARRAY_FIELDS:
+            array = np.full(capacity, fill, dtype=dtype)
+            if hasattr(self, name):
+                array[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def add(self, robot_id: int, vertex: int, max_speed: Optional[float] = None) -> Robot:
+        if self.size == self.capacity:
+            self._allocate(self.capacity * 2)
+        slot = self.size
+        self.size += 1
+        self.ids[slot] = robot_id
+        robot = ArrayRobot(self, slot, robot_id, vertex, max_speed)
+        self._by_slot.append(robot)
+        self.robots[robot_id] = robot
+        self.changes.mark_added(robot_id)
+        return robot
+
+    def remove(self, robot: ArrayRobot):
+        # Move the last slot into the hole so live robots stay packed at the front
+        slot, last = robot._slot, self.size - 1
+        if slot != last:
+            moved = self._by_slot[last]
+            for name, _, _ in ARRAY_FIELDS:
+                array = getattr(self, name)
+                array[slot] = array[last]
+            moved._slot = slot
+            self._by_slot[slot] = moved
+        for name, _, fill in ARRAY_FIELDS:
+            getattr(self, name)[last] = fill
+        self._by_slot.pop()
+        self.size -= 1
+        del self.robots[robot.id]
+        self.changes.mark_removed(robot.id)
+
+    def mark_changed(self, robot: ArrayRobot):
+        self.versions[robot._slot] = self.changes.next_version()
+
+    def changed_since(self, since: int) -> Tuple[List[int], int]:
+        slots = np.flatnonzero(self.versions[:self.size] > since)
+        return self.ids[slots].tolist(), self.version
+
+    def step(self, traffic_manager, dt: float) -> int:
+        n = self.size
+        status = self.status[:n]
+        granted = self.granted[:n]
+        progress = self.progress[:n]
+        before = status.copy()
+
+        # Robots at the start of a lane (new route, just woken, previous lane done) ask for it
+        for slot in np.flatnonzero((status == MOVING) & ~granted & (self.next[:n] >= 0)):
+            robot = self._by_slot[slot]
+            if traffic_manager.request_move(robot, (robot.current_vertex, robot.path[0])):
+                granted[slot] = True
+            else:
+                robot.status = RobotStatus.WAITING
+                log(f"Robot {robot.id} waiting at vertex {robot.current_vertex}")
+
+        driving = (status == MOVING) & granted
+        progress[driving] += dt / self.edge_time[:n][driving]
+        for slot in np.flatnonzero(driving & (progress >= 1.0)):
+            self._by_slot[slot].finish_edge(traffic_manager)
+
+        self.versions[:n][(before == MOVING) | (status != before)] = self.changes.next_version()
+        return int(np.count_nonzero((status == TASK_COMPLETE) & (before != TASK_COMPLETE)))
+
+    def position(self, robot: ArrayRobot) -> Tuple[float, float]:
+        slot = robot._slot
+        start = self.coords[self.current[slot]]
+        if self.status[slot] == MOVING and self.next[slot] >= 0:
+            x, y = start + (self.coords[self.next[slot]] - start) * self.progress[slot]
+        else:
+            x, y = start
+        return float(x), float(y)
+
+    def position_array(self) -> "np.ndarray":
+        """(size, 2) array of interpolated robot positions, in slot order."""
+        n = self.size
+        current = self.current[:n]
+        start = self.coords[current]
+        moving = (self.status[:n] == MOVING) & (self.next[:n] >= 0)
+        target = self.coords[np.where(moving, self.next[:n], current)]
+        return start + (target - start) * np.where(moving, self.progress[:n], 0.0)[:, None]
+
+    def positions(self) -> Dict[int, Tuple[float, float]]:
+        return dict(zip(self.ids[:self.size].tolist(), map(tuple, self.position_array().tolist())))
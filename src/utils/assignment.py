@@ -0,0 +1,72 @@
+import math
+from typing import List, Tuple
+
+Matrix = List[List[float]]
+
+def hungarian(costs: Matrix) -> List[Tuple[int, int]]:
+    """Minimum-cost matching of rows to columns (rectangular allowed), O(n^2 m).
+
+    Returns (row, column) pairs; every row is matched when there are no more
+    rows than columns, and vice versa. Pairs with an infinite cost are dropped.
+    """
+    if not costs or not costs[0]:
+        return []
+    transposed = len(costs) > len(costs[0])
+    matrix = [list(column) for column in zip(*costs)] if transposed else costs
+    n, m = len(matrix), len(matrix[0])
+    # Infinite entries become a cost larger than any complete finite matching
+    finite = [c for row in matrix for c in row if c < math.inf]
+    big = (max(finite, default=0.0) + 1.0) * (n + 1)
+
+    # Shortest augmenting paths with row/column potentials u, v; p[j] is the row matched to column j
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [math.inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = matrix[i0 - 1]
+            delta, j1 = math.inf, 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cost = row[j - 1]
+                    cur = (cost if cost < math.inf else big) - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    pairs = [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j] and matrix[p[j] - 1][j - 1] < math.inf]
+    return [(column, row) for row, column in pairs] if transposed else pairs
+
+def greedy_assignment(costs: Matrix) -> List[Tuple[int, int]]:
+    """Repeatedly match the cheapest remaining (row, column) pair. Fast, not optimal."""
+    candidates = sorted((cost, i, j) for i, row in enumerate(costs) for j, cost in enumerate(row) if cost < math.inf)
+    used_rows, used_columns = set(), set()
+    pairs = []
+    for _, i, j in candidates:
+        if i not in used_rows and j not in used_columns:
+            used_rows.add(i)
+            used_columns.add(j)
+            pairs.append((i, j))
+    return pairs
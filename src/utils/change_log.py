@@ -0,0 +1,51 @@
+from collections import OrderedDict
+from typing import List
+
+class ChangeLog:
+    """Which robot ids changed or were removed after a version, for incremental snapshots.
+
+    Every change or removal takes the next version. Each id keeps only its
+    latest mark, and marks are ordered oldest first, so changed_since(v)
+    stops at the first entry not newer than v instead of scanning all ids.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._changed: "OrderedDict[int, int]" = OrderedDict()
+        self._removed: "OrderedDict[int, int]" = OrderedDict()
+
+    def next_version(self) -> int:
+        """Advance the version for changes tracked elsewhere (e.g. ArrayRobotStore's per-slot array)."""
+        self.version += 1
+        return self.version
+
+    def mark_changed(self, robot_id: int):
+        self._changed[robot_id] = self.next_version()
+        self._changed.move_to_end(robot_id)
+
+    def mark_removed(self, robot_id: int):
+        self._changed.pop(robot_id, None)
+        self._removed[robot_id] = self.next_version()
+        self._removed.move_to_end(robot_id)
+
+    def mark_added(self, robot_id: int):
+        """A (possibly reused) id is in the fleet again, so it no longer counts as removed."""
+        self._removed.pop(robot_id, None)
+
+    def clear_changes(self):
+        self._changed.clear()
+
+    def changed_since(self, since: int) -> List[int]:
+        return self._newer(self._changed, since)
+
+    def removed_since(self, since: int) -> List[int]:
+        return self._newer(self._removed, since)
+
+    @staticmethod
+    def _newer(marks: "OrderedDict[int, int]", since: int) -> List[int]:
+        newer = []
+        for robot_id in reversed(marks):
+            if marks[robot_id] <= since:
+                break
+            newer.append(robot_id)
+        return newer
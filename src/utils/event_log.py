@@ -0,0 +1,188 @@
+import bisect
+import mmap
+import struct
+from enum import IntEnum
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+from src.utils.logger import log
+
+MAGIC = b"FLEETLOG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sI')
+# Block header: block type, tick, record count, payload bytes
+BLOCK = struct.Struct('<cIII')
+EVENTS_BLOCK = b'E'
+SNAPSHOT_BLOCK = b'S'
+# Event: tick, kind, robot id, three integer arguments (see EventKind), float argument
+EVENT = struct.Struct('<IBiiiid')
+# Snapshot payload header: simulated time, timestep, tasks completed
+SNAPSHOT = struct.Struct('<ddq')
+# Robot in a snapshot: id, vertex, next vertex, destination, status code, lane progress, lane time
+ROBOT = struct.Struct('<iiiiBdd')
+# Buffered event bytes written out as one block
+FLUSH_BYTES = 1 << 16
+
+class EventKind(IntEnum):
+    """Event types and the meaning of their (a, b, c, value) arguments; -1 / 0.0 when unused."""
+    TIMESTEP = 0   # value: seconds per tick from this tick on
+    SPAWN = 1      # a: vertex
+    REMOVE = 2     # a: vertex
+    ASSIGN = 3     # a: start vertex, b: destination, c: lanes on the route, value: planned seconds
+    WAIT = 4       # a, b: requested lane, c: vertex the robot is queued on
+    RESERVE = 5    # a, b: lane granted to a queued robot
+    DEPART = 6     # a, b: lane the robot starts driving, value: lane time
+    ARRIVE = 7     # a, b: lane the robot finished
+    COMPLETE = 8   # a: vertex where the task finished
+
+class Event(NamedTuple):
+    tick: int
+    # An EventKind value, left as a plain int so replay does not pay for enum lookups
+    kind: int
+    robot: int
+    a: int
+    b: int
+    c: int
+    value: float
+
+class Snapshot(NamedTuple):
+    tick: int
+    sim_time: float
+    timestep: float
+    tasks_completed: int
+    # (id, vertex, next vertex, destination, status code, progress, lane time) per robot
+    robots: List[Tuple[int, int, int, int, int, float, float]]
+
+class EventLogWriter:
+    """Append-only binary log of fleet events with periodic full snapshots.
+
+    Events are fixed-size records buffered into blocks; every block starts with
+    a small header, so a reader can hop from snapshot to snapshot without
+    decoding the events in between. `tick` stamps the events emitted next.
+    """
+
+    def __init__(self, path: str, snapshot_interval: int):
+        if snapshot_interval <= 0:
+            raise ValueError(f"Invalid snapshot interval {snapshot_interval}")
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self.tick = 0
+        self.timestep = 0.0
+        self.snapshot_tick = -1
+        self.events_written = 0
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION))
+        self._buffer = bytearray()
+        self._buffer_tick = 0
+        self._buffer_count = 0
+
+    def emit(self, kind: EventKind, robot: int = -1, a: int = -1, b: int = -1, c: int = -1, value: float = 0.0):
+        if not self._buffer_count:
+            self._buffer_tick = self.tick
+        self._buffer += EVENT.pack(self.tick, kind, robot, a, b, c, value)
+        self._buffer_count += 1
+        if len(self._buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self._buffer_count:
+            self._file.write(BLOCK.pack(EVENTS_BLOCK, self._buffer_tick, self._buffer_count, len(self._buffer)))
+            self._file.write(self._buffer)
+            self.events_written += self._buffer_count
+            self._buffer = bytearray()
+            self._buffer_count = 0
+        self._file.flush()
+
+    def snapshot_due(self) -> bool:
+        return self.tick - self.snapshot_tick >= self.snapshot_interval
+
+    def write_snapshot(self, sim_time: float, tasks_completed: int, robots: List[Tuple]):
+        """Full fleet state at the current tick, after every event emitted so far."""
+        self.flush()
+        payload = SNAPSHOT.pack(sim_time, self.timestep, tasks_completed) + b''.join(ROBOT.pack(*r) for r in robots)
+        self._file.write(BLOCK.pack(SNAPSHOT_BLOCK, self.tick, len(robots), len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        self.snapshot_tick = self.tick
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+class EventLogReader:
+    """Random access to an event log: block index built from headers, payloads decoded on demand."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+        if len(self._data) < HEADER.size or HEADER.unpack_from(self._data)[0] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a fleet event log")
+        version = HEADER.unpack_from(self._data)[1]
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported event log version {version}")
+        # (block type, tick, record count, payload offset, payload bytes)
+        self.blocks: List[Tuple[bytes, int, int, int, int]] = []
+        offset = HEADER.size
+        while offset + BLOCK.size <= len(self._data):
+            kind, tick, count, size = BLOCK.unpack_from(self._data, offset)
+            if offset + BLOCK.size + size > len(self._data):
+                break
+            self.blocks.append((kind, tick, count, offset + BLOCK.size, size))
+            offset += BLOCK.size + size
+        if offset != len(self._data):
+            # The writer did not close cleanly; everything up to the last whole block is usable
+            log(f"Warning: Ignoring {len(self._data) - offset} trailing bytes of {path}")
+        self._snapshot_blocks = [i for i, block in enumerate(self.blocks) if block[0] == SNAPSHOT_BLOCK]
+        self.snapshot_ticks = [self.blocks[i][1] for i in self._snapshot_blocks]
+        if not self._snapshot_blocks:
+            self.close()
+            raise ValueError(f"{path} has no snapshot")
+
+    def close(self):
+        if getattr(self, '_data', None) is not None:
+            self._data.close()
+            self._data = None
+        self._file.close()
+
+    def __enter__(self) -> "EventLogReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def first_tick(self) -> int:
+        return self.snapshot_ticks[0]
+
+    @property
+    def last_tick(self) -> int:
+        """Last tick with a snapshot or an event."""
+        kind, tick, count, offset, size = self.blocks[-1]
+        if kind == EVENTS_BLOCK:
+            return EVENT.unpack_from(self._data, offset + size - EVENT.size)[0]
+        return tick
+
+    def snapshot_before(self, tick: int) -> int:
+        """Index (into snapshot_ticks) of the latest snapshot at or before tick, or the first one."""
+        return max(bisect.bisect_right(self.snapshot_ticks, tick) - 1, 0)
+
+    def read_snapshot(self, index: int) -> Snapshot:
+        kind, tick, count, offset, size = self.blocks[self._snapshot_blocks[index]]
+        sim_time, timestep, tasks_completed = SNAPSHOT.unpack_from(self._data, offset)
+        start = offset + SNAPSHOT.size
+        robots = list(ROBOT.iter_unpack(self._data[start:offset + size]))
+        return Snapshot(tick, sim_time, timestep, tasks_completed, robots)
+
+    def events(self, snapshot_index: Optional[int] = None) -> Iterator[Event]:
+        """Events in log order, starting right after the given snapshot (or at the beginning)."""
+        start = 0 if snapshot_index is None else self._snapshot_blocks[snapshot_index] + 1
+        for kind, _, _, offset, size in self.blocks[start:]:
+            if kind != EVENTS_BLOCK:
+                continue
+            yield from map(Event._make, EVENT.iter_unpack(self._data[offset:offset + size]))
@@ -1,14 +1,73 @@
 import os
+import atexit
 import logging
+import queue
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
 
-def setup_logger():
+LOG_FORMAT = '%(asctime)s - %(message)s'
+
+_ring_handler: Optional["RingBufferHandler"] = None
+_listener: Optional[QueueListener] = None
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the most recent records in memory; formatting is deferred until they are read."""
+
+    def __init__(self, capacity: int = 200):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        # Total records ever emitted, so readers can tell whether anything new arrived
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+        self.count += 1
+
+    def tail(self, n: int) -> List[str]:
+        with self.lock:
+            records = list(self.records)[-n:]
+        return [self.format(record) for record in records]
+
+def setup_logger(max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3, buffer_size: int = 200):
+    """Attach the in-memory ring buffer and a queue-fed, rotating file writer to the root logger.
+
+    File writes happen on the QueueListener's thread, so log() never blocks on disk.
+    """
+    global _ring_handler, _listener
+    if _listener is not None:
+        return
     log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'logs')
     os.makedirs(log_dir, exist_ok=True)
-    logging.basicConfig(
-        filename=os.path.join(log_dir, 'fleet_logs.txt'),
-        level=logging.INFO,
-        format='%(asctime)s - %(message)s'
-    )
+    file_handler = RotatingFileHandler(os.path.join(log_dir, 'fleet_logs.txt'),
+                                       maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, file_handler)
+    _listener.start()
+    atexit.register(shutdown_logger)
+
+    _ring_handler = RingBufferHandler(buffer_size)
+    _ring_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    root.addHandler(_ring_handler)
+
+def shutdown_logger():
+    """Flush queued records to disk and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def get_recent_logs(n: int = 20) -> List[str]:
+    return _ring_handler.tail(n) if _ring_handler is not None else []
+
+def get_log_count() -> int:
+    return _ring_handler.count if _ring_handler is not None else 0
 
 def log(message):
-    logging.info(message)
\ No newline at end of file
+    logging.info(message)
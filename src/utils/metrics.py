@@ -0,0 +1,101 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Histogram bucket i holds durations below 2**i microseconds (bucket 0: under 1 us)
+HISTOGRAM_BUCKETS = 40
+
+class Histogram:
+    """Durations in power-of-two microsecond buckets: constant memory, percentiles within a factor of 2."""
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0 < q <= 100), capped at the maximum."""
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(2 ** i * 1e-6, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {"count": self.count, "mean": self.mean, "p50": self.percentile(50),
+                "p99": self.percentile(99), "max": self.max}
+
+class Metrics:
+    """Counters, gauges and timing histograms for the hot paths, read through snapshot()/report()."""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.gauges: Dict[str, float] = {}
+        self.timings: Dict[str, Histogram] = defaultdict(Histogram)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        self.timings[name].record(seconds)
+
+    @contextmanager
+    def timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name].record(time.perf_counter() - start)
+
+    def reset(self):
+        self.counters.clear()
+        self.gauges.clear()
+        self.timings.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Plain-dict copy: {"counters": {...}, "gauges": {...}, "timings": {name: summary}}.
+
+        Safe to call while another thread records: each dict is copied in one step.
+        """
+        return {"counters": dict(self.counters), "gauges": dict(self.gauges),
+                "timings": {name: h.summary() for name, h in list(self.timings.items()) if h.count}}
+
+    def report(self) -> List[str]:
+        return format_report(self.snapshot())
+
+def merge_snapshots(*snapshots: Dict[str, Dict]) -> Dict[str, Dict]:
+    merged = {"counters": {}, "gauges": {}, "timings": {}}
+    for snapshot in snapshots:
+        for section in merged:
+            merged[section].update(snapshot[section])
+    return merged
+
+def format_report(snapshot: Dict[str, Dict]) -> List[str]:
+    """One line per timing histogram, then the counters and gauges."""
+    lines = []
+    for name, t in sorted(snapshot["timings"].items()):
+        lines.append(f"{name:<22} n={t['count']:<8} mean {t['mean'] * 1e3:8.3f} ms  p50 {t['p50'] * 1e3:8.3f} ms  "
+                     f"p99 {t['p99'] * 1e3:8.3f} ms  max {t['max'] * 1e3:8.3f} ms")
+    values = sorted(snapshot["counters"].items()) + sorted(snapshot["gauges"].items())
+    if values:
+        lines.append("  ".join(f"{name}={value:g}" for name, value in values))
+    return lines
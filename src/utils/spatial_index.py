@@ -0,0 +1,119 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+class SpatialGrid:
+    """Uniform grid hash over 2D points keyed by integer ids, with in-place moves."""
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError(f"Invalid cell size {cell_size}")
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Dict[int, Point]] = {}
+        self._items: Dict[int, Tuple[Tuple[int, int], Point]] = {}
+        # Occupied cell range; only ever grows, which keeps it a valid search bound
+        self._bounds: Optional[List[int]] = None
+
+    @classmethod
+    def for_points(cls, points: Iterable[Tuple[int, Point]]) -> "SpatialGrid":
+        """Build a grid sized so that each cell holds about one point."""
+        points = list(points)
+        if points:
+            xs = [p[0] for _, p in points]
+            ys = [p[1] for _, p in points]
+            area = (max(xs) - min(xs)) * (max(ys) - min(ys))
+            cell_size = math.sqrt(area / len(points)) if area > 0 else max(max(xs) - min(xs), max(ys) - min(ys))
+        else:
+            cell_size = 0
+        grid = cls(cell_size if cell_size > 0 else 1.0)
+        for item_id, pos in points:
+            grid.insert(item_id, pos)
+        return grid
+
+    def _cell(self, pos: Point) -> Tuple[int, int]:
+        return int(math.floor(pos[0] / self.cell_size)), int(math.floor(pos[1] / self.cell_size))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._items
+
+    def insert(self, item_id: int, pos: Point):
+        """Add item_id at pos, moving it if it is already indexed."""
+        cell = self._cell(pos)
+        entry = self._items.get(item_id)
+        if entry is not None and entry[0] != cell:
+            self._remove_from_cell(item_id, entry[0])
+        self._cells.setdefault(cell, {})[item_id] = pos
+        self._items[item_id] = (cell, pos)
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[0], cell[1], cell[1]]
+        else:
+            bounds = self._bounds
+            bounds[0], bounds[1] = min(bounds[0], cell[0]), max(bounds[1], cell[0])
+            bounds[2], bounds[3] = min(bounds[2], cell[1]), max(bounds[3], cell[1])
+
+    def remove(self, item_id: int):
+        entry = self._items.pop(item_id, None)
+        if entry is not None:
+            self._remove_from_cell(item_id, entry[0])
+
+    def _remove_from_cell(self, item_id: int, cell: Tuple[int, int]):
+        bucket = self._cells[cell]
+        del bucket[item_id]
+        if not bucket:
+            del self._cells[cell]
+
+    def within_radius(self, pos: Point, radius: float) -> List[int]:
+        """Ids within radius of pos, nearest first."""
+        cx0, cy0 = self._cell((pos[0] - radius, pos[1] - radius))
+        cx1, cy1 = self._cell((pos[0] + radius, pos[1] + radius))
+        r2 = radius * radius
+        hits = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self._cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for item_id, (x, y) in bucket.items():
+                    d2 = (x - pos[0]) ** 2 + (y - pos[1]) ** 2
+                    if d2 <= r2:
+                        hits.append((d2, item_id))
+        hits.sort()
+        return [item_id for _, item_id in hits]
+
+    def nearest(self, pos: Point, max_distance: Optional[float] = None) -> Optional[int]:
+        """Closest id to pos (optionally no further than max_distance), searching rings of cells outwards."""
+        if not self._items:
+            return None
+        if max_distance is not None:
+            hits = self.within_radius(pos, max_distance)
+            return hits[0] if hits else None
+        cx, cy = self._cell(pos)
+        min_x, max_x, min_y, max_y = self._bounds
+        max_ring = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+        best, best_d2 = None, math.inf
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(cx, cy, ring):
+                for item_id, (x, y) in self._cells.get(cell, {}).items():
+                    d2 = (x - pos[0]) ** 2 + (y - pos[1]) ** 2
+                    if d2 < best_d2:
+                        best, best_d2 = item_id, d2
+            # Anything in a further ring is at least ring * cell_size away
+            if best is not None and best_d2 <= (ring * self.cell_size) ** 2:
+                break
+        return best
+
+    @staticmethod
+    def _ring_cells(cx: int, cy: int, ring: int):
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import socket
+from benchmarks.graphs import grid_graph_data
+from src.models.nav_graph import NavGraph
+from src.controllers.fleet_manager import FleetManager
+from src.controllers.simulation_engine import SimulationEngine
+from src.controllers.control_server import ControlServer
+
+
+def make_server(size: int = 10, robots: int = 0) -> ControlServer:
+    fleet_manager = FleetManager(NavGraph.from_data(grid_graph_data(size, size)))
+    for vertex in range(robots):
+        fleet_manager.spawn_robot(vertex)
+    return ControlServer(SimulationEngine(fleet_manager, realtime=False))
+
+
+def test_response_buffer_stays_bounded_for_a_client_that_never_reads():
+    async def run():
+        server = make_server(robots=100)
+        await server.start()
+        host, port = server.address.rsplit(":", 1)
+        sock = socket.create_connection((host, int(port)))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        _, writer = await asyncio.open_connection(sock=sock)
+        request = json.dumps({"id": 0, "op": "state"}).encode() + b"\n"
+        peak = 0
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 2.0
+        # Each state response is several KB, so unread responses would pile up fast
+        while loop.time() < deadline:
+            writer.write(request * 64)
+            try:
+                await asyncio.wait_for(writer.drain(), 0.05)
+            except asyncio.TimeoutError:
+                pass
+            sizes = [w.transport.get_write_buffer_size() for w in server._connections.values()]
+            peak = max([peak] + sizes)
+        writer.close()
+        await server.close()
+        return peak
+
+    assert asyncio.run(run()) < 1 << 20
+
+
+def test_refused_fields_are_answered_and_the_server_keeps_serving():
+    async def run():
+        server = make_server(robots=1)
+        await server.start()
+        host, port = server.address.rsplit(":", 1)
+        reader, writer = await asyncio.open_connection(host, int(port))
+        answers = []
+        for request in (b'{"id": 1, "op": "assign", "robot": 0, "vertex": 1e400}',
+                        b'{"id": 2, "op": "assign", "robot": true, "vertex": 3}',
+                        b'{"id": 3, "op": "assign", "robot": 0, "vertex": 3}',
+                        b'{"id": 4, "op": "spawn", "vertex": 5, "max_speed": "fast"}',
+                        b'{"id": 5, "op": "spawn", "vertex": 5, "max_speed": 0}',
+                        b'{"id": 6, "op": "spawn", "vertex": 5, "max_speed": 0.5}'):
+            writer.write(request + b"\n")
+            await writer.drain()
+            answers.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+        writer.close()
+        await server.close()
+        return answers
+
+    answers = asyncio.run(run())
+    assert [answer["ok"] for answer in answers] == [False, False, True, False, False, True]
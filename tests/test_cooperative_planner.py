@@ -0,0 +1,42 @@
+from benchmarks.graphs import grid_graph_data
+from src.models.nav_graph import NavGraph
+from src.models.robot import RobotStatus
+from src.controllers.fleet_manager import FleetManager
+
+
+def grid_with_island(size: int = 6) -> NavGraph:
+    """A size x size grid plus one vertex (id size * size) with no lanes."""
+    data = grid_graph_data(size, size)
+    data["levels"]["level1"]["vertices"].append([size + 5.0, size + 5.0, {"name": "island"}])
+    return NavGraph.from_data(data)
+
+
+def reservations(fleet_manager: FleetManager, robot_id: int):
+    table = fleet_manager.planner.table
+    return (sorted(table.robot_slots.get(robot_id, [])), table.robot_parking.get(robot_id),
+            fleet_manager._replan_at.get(robot_id))
+
+
+def test_refused_assignment_keeps_the_current_plan():
+    fleet_manager = FleetManager(grid_with_island(), planner="cooperative")
+    robot_id = fleet_manager.spawn_robot(0)
+    assert fleet_manager.assign_task(robot_id, 35)
+    for _ in range(10):
+        fleet_manager.update()
+    robot = fleet_manager.robots[robot_id]
+    before = reservations(fleet_manager, robot_id)
+    path = list(robot.path)
+    assert before[0]
+
+    assert not fleet_manager.assign_task(robot_id, 36)
+    assert reservations(fleet_manager, robot_id) == before
+    assert robot.path == path and robot.status == RobotStatus.MOVING
+    assert fleet_manager.metrics.counters['plan.fallbacks'] == 0
+
+
+def test_standing_robot_stays_parked():
+    fleet_manager = FleetManager(grid_with_island(), planner="cooperative")
+    robot_id = fleet_manager.spawn_robot(0)
+    assert fleet_manager.planner.table.robot_parking[robot_id] == 0
+    assert not fleet_manager.assign_task(robot_id, 36)
+    assert fleet_manager.planner.table.robot_parking[robot_id] == 0
@@ -0,0 +1,23 @@
+import pytest
+from benchmarks.graphs import grid_graph_data
+from src.models.nav_graph import NavGraph
+from src.controllers.fleet_manager import FleetManager
+
+
+def test_spawn_max_speed_caps_lane_times():
+    fleet_manager = FleetManager(NavGraph.from_data(grid_graph_data(5, 5, speed_limit=2.0)))
+    fast = fleet_manager.spawn_robot(0)
+    slow = fleet_manager.spawn_robot(20, max_speed=0.5)
+    assert fleet_manager.assign_task(fast, 4)
+    assert fleet_manager.assign_task(slow, 24)
+    robots = fleet_manager.store.robots
+    assert robots[fast].edge_times == pytest.approx([0.5] * 4)
+    assert robots[slow].edge_times == pytest.approx([2.0] * 4)
+
+
+@pytest.mark.parametrize("max_speed", [0, -1.0, float("nan")])
+def test_spawn_refuses_invalid_max_speed(max_speed):
+    fleet_manager = FleetManager(NavGraph.from_data(grid_graph_data(3, 3)))
+    with pytest.raises(ValueError):
+        fleet_manager.spawn_robot(0, max_speed=max_speed)
+    assert not fleet_manager.store.robots